@@ -0,0 +1,87 @@
+"""
+Measure how long importing parts of :mod:`mopidy_client` takes.
+
+Every target is imported in a fresh interpreter several times; the median
+wall time minus that of an empty interpreter is reported, along with the
+slowest modules from ``python -X importtime`` with ``--verbose``::
+
+    python -m benchmarks.importtime
+    python -m benchmarks.importtime --verbose mopidy_client.cli
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+DEFAULT_TARGETS = (
+    "mopidy_client",
+    "mopidy_client.models",
+    "mopidy_client.client",
+    "mopidy_client.cli",
+    "mopidy_client.transport.asyncio_ws",
+    "mopidy_client.transport.tornado_ws",
+)
+
+
+def _run(code, importtime=False):
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ["-X", "importtime"]
+    start = time.perf_counter()
+    proc = subprocess.run(
+        cmd + ["-c", code], stderr=subprocess.PIPE, check=True, text=True
+    )
+    return time.perf_counter() - start, proc.stderr
+
+
+def measure(target, repeat=10):
+    """
+    Return the median seconds importing ``target`` adds to interpreter
+    startup.
+    """
+    baseline = statistics.median(_run("pass")[0] for _ in range(repeat))
+    seconds = statistics.median(_run(f"import {target}")[0] for _ in range(repeat))
+    return seconds - baseline
+
+
+def _import_times(code):
+    _, output = _run(code, importtime=True)
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        yield int(cumulative), name.strip()
+
+
+def slowest_modules(target, limit=10):
+    """
+    Return ``(cumulative microseconds, module)`` of the slowest imports
+    triggered by ``target``, leaving out those of interpreter startup.
+    """
+    startup = {name for _, name in _import_times("pass")}
+    rows = [row for row in _import_times(f"import {target}") if row[1] not in startup]
+    return sorted(rows, reverse=True)[:limit]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("targets", nargs="*", default=DEFAULT_TARGETS)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument(
+        "--verbose", action="store_true", help="list the slowest imports"
+    )
+    args = parser.parse_args(argv)
+
+    for target in args.targets:
+        seconds = measure(target, args.repeat)
+        print(f"{target:<40} {seconds * 1000:>8.1f} ms", flush=True)
+        if args.verbose:
+            for cumulative, name in slowest_modules(target):
+                print(f"    {cumulative / 1000:>8.1f} ms  {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,283 @@
+"""
+Load test driving :class:`~mopidy_client.Client` against a fake Mopidy.
+
+Starts a :class:`~mopidy_client.testing.FakeMopidyServer` in process (or
+uses ``--url``), connects several clients that issue a weighted mix of calls
+with the given concurrency while the server emits an event storm, and
+reports throughput, latency percentiles, event lag and memory::
+
+    python -m benchmarks.loadtest --clients 4 --concurrency 16 --duration 10
+    python -m benchmarks.loadtest --latency 0.005 --tracks 5000 \\
+        --mix core.tracklist.get_tracks=1,core.playback.get_state=9
+
+The server shares the event loop with the clients unless run separately
+with ``--serve`` and targeted with ``--url``; its work then no longer counts
+against the client.
+"""
+
+import argparse
+import asyncio
+import gc
+import random
+import resource
+import sys
+import time
+import tracemalloc
+
+from mopidy_client import Client
+from mopidy_client.models import TlTrack
+from mopidy_client.testing import FakeMopidy, FakeMopidyServer
+
+from .models import build_tracks, library_data
+
+DEFAULT_MIX = (
+    "core.playback.get_state=4,core.playback.get_time_position=4,"
+    "core.mixer.get_volume=2,core.tracklist.get_tracks=1"
+)
+
+STORM_EVENT = "volume_changed"
+
+
+def fake_mopidy(tracks=100, replay=None):
+    """
+    Return a :class:`FakeMopidy` serving a tracklist of ``tracks`` synthetic
+    tracks, or the recorded results in ``replay``.
+    """
+    library = build_tracks(library_data(tracks))
+    tl_tracks = [TlTrack(tlid=i, track=track) for i, track in enumerate(library)]
+    by_uri = {track.uri: [track] for track in library}
+    fake = FakeMopidy(
+        {
+            "core.playback.get_state": "playing",
+            "core.playback.get_time_position": lambda: random.randrange(600000),
+            "core.mixer.get_volume": 50,
+            "core.tracklist.get_length": len(library),
+            "core.tracklist.get_tracks": library,
+            "core.tracklist.get_tl_tracks": tl_tracks,
+            "core.library.lookup": lambda uris: {
+                uri: by_uri.get(uri, []) for uri in uris
+            },
+        }
+    )
+    if replay is not None:
+        fake.load(replay)
+    return fake
+
+
+def parse_mix(mix):
+    methods, weights = [], []
+    for item in mix.split(","):
+        method, _, weight = item.partition("=")
+        methods.append(method.strip())
+        weights.append(float(weight or 1))
+    return methods, weights
+
+
+def percentile(samples, percent):
+    """Return the ``percent`` percentile of the sorted ``samples``."""
+    if not samples:
+        return None
+    index = min(len(samples) - 1, int(round(percent / 100 * (len(samples) - 1))))
+    return samples[index]
+
+
+class LoadTest:
+
+    """
+    Run one load test and collect its measurements.
+
+    :param url: websocket URL of the server
+    :param clients: number of connected clients
+    :param concurrency: calls in flight per client
+    :param duration: seconds to issue calls for
+    :param mix: ``(methods, weights)`` to pick calls from
+    :param client_options: keyword arguments for every :class:`Client`
+    :param connect_options: keyword arguments for :meth:`Client.connect`
+    """
+
+    def __init__(
+        self,
+        url,
+        clients,
+        concurrency,
+        duration,
+        mix,
+        client_options=None,
+        connect_options=None,
+    ):
+        self.url = url
+        self.clients = clients
+        self.concurrency = concurrency
+        self.duration = duration
+        self.methods, self.weights = mix
+        self.client_options = client_options or {}
+        self.connect_options = connect_options or {}
+        self.latencies = []
+        self.errors = 0
+        self.event_lags = []
+        self.elapsed = None
+
+    def _on_event(self, sent=None, **data):
+        if sent is not None:
+            self.event_lags.append(time.perf_counter() - sent)
+
+    async def _worker(self, client, deadline):
+        rnd = random.Random()
+        while time.perf_counter() < deadline:
+            method = rnd.choices(self.methods, self.weights)[0]
+            start = time.perf_counter()
+            try:
+                await client.call(method)
+            except Exception:
+                self.errors += 1
+                continue
+            self.latencies.append(time.perf_counter() - start)
+
+    async def run(self, storm=None):
+        """
+        Connect the clients and issue calls for ``duration`` seconds.
+
+        :param storm: optional coroutine emitting events, run alongside
+        """
+        clients = []
+        for _ in range(self.clients):
+            client = Client(self.url, auto_reconnect=False, **self.client_options)
+            await client.connect(**self.connect_options)
+            client.on_event(STORM_EVENT, self._on_event)
+            clients.append(client)
+
+        start = time.perf_counter()
+        deadline = start + self.duration
+        tasks = [
+            self._worker(client, deadline)
+            for client in clients
+            for _ in range(self.concurrency)
+        ]
+        if storm is not None:
+            tasks.append(storm)
+        await asyncio.gather(*tasks)
+        self.elapsed = time.perf_counter() - start
+        # Give queued event handlers a moment to catch up
+        await asyncio.sleep(0.1)
+
+        for client in clients:
+            await client.disconnect()
+
+    def report(self):
+        latencies = sorted(self.latencies)
+        lags = sorted(self.event_lags)
+        return {
+            "requests": len(latencies),
+            "errors": self.errors,
+            "throughput": len(latencies) / self.elapsed,
+            "latency_p50": percentile(latencies, 50),
+            "latency_p99": percentile(latencies, 99),
+            "latency_max": latencies[-1] if latencies else None,
+            "events": len(lags),
+            "event_lag_p50": percentile(lags, 50),
+            "event_lag_p99": percentile(lags, 99),
+        }
+
+
+def _max_rss():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def _ms(seconds):
+    return "-" if seconds is None else f"{seconds * 1000:.2f} ms"
+
+
+async def main_async(args):
+    server = None
+    if args.url is None or args.serve:
+        server = FakeMopidyServer(
+            fake_mopidy(args.tracks, args.replay),
+            latency=args.latency,
+            jitter=args.jitter,
+            compression={} if args.compression else None,
+        )
+        await server.start(args.port)
+        print(f"Fake Mopidy listening on {server.url}", flush=True)
+        if args.serve:
+            await asyncio.Event().wait()
+
+    test = LoadTest(
+        args.url or server.url,
+        args.clients,
+        args.concurrency,
+        args.duration,
+        parse_mix(args.mix),
+        {"transport": args.transport},
+        {"compression": True} if args.compression else None,
+    )
+    storm = None
+    if server is not None and args.events:
+        storm = server.event_storm(
+            STORM_EVENT,
+            args.events,
+            rate=args.event_rate,
+            volume=50,
+            sent=time.perf_counter,
+        )
+
+    if args.tracemalloc:
+        tracemalloc.start()
+    gc.collect()
+    await test.run(storm)
+    report = test.report()
+    if args.tracemalloc:
+        report["traced_peak"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    if server is not None:
+        server.stop()
+
+    print(f"requests     {report['requests']} ({report['errors']} errors)")
+    print(f"throughput   {report['throughput']:.0f} req/s")
+    print(
+        f"latency      p50 {_ms(report['latency_p50'])}  "
+        f"p99 {_ms(report['latency_p99'])}  max {_ms(report['latency_max'])}"
+    )
+    if args.events:
+        print(
+            f"events       {report['events']} of {args.events * args.clients}  "
+            f"lag p50 {_ms(report['event_lag_p50'])}  "
+            f"p99 {_ms(report['event_lag_p99'])}"
+        )
+    print(f"max rss      {_max_rss() / 1024 / 1024:.1f} MiB")
+    if "traced_peak" in report:
+        print(f"traced peak  {report['traced_peak'] / 1024 / 1024:.1f} MiB")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--url", help="server to test instead of the fake one")
+    parser.add_argument("--serve", action="store_true", help="only run the fake server")
+    parser.add_argument("--port", type=int, default=0, help="fake server port")
+    parser.add_argument("--clients", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument(
+        "--mix", default=DEFAULT_MIX, help="comma separated method=weight list"
+    )
+    parser.add_argument(
+        "--transport", default="tornado", choices=("tornado", "asyncio")
+    )
+    parser.add_argument("--tracks", type=int, default=100, help="tracklist length")
+    parser.add_argument("--replay", metavar="PATH", help="recorded results to serve")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--compression", action="store_true")
+    parser.add_argument("--events", type=int, default=0, help="events to emit")
+    parser.add_argument("--event-rate", type=float, help="events per second")
+    parser.add_argument("--tracemalloc", action="store_true")
+    args = parser.parse_args(argv)
+
+    asyncio.run(main_async(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,318 @@
+"""
+Benchmarks for :mod:`mopidy_client.models`.
+
+Runs every case against synthetic libraries of the given sizes and reports
+the best time of several repeats and the peak memory of one extra run under
+:mod:`tracemalloc`. Results can be saved and later compared::
+
+    python -m benchmarks.models --sizes 1000,10000 --save baseline.json
+    python -m benchmarks.models --sizes 1000,10000 --compare baseline.json
+
+Comparing exits with status 1 when a case got slower than ``--threshold``.
+"""
+
+import argparse
+import gc
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from mopidy_client import models
+
+DEFAULT_SIZES = (1000, 10000)
+
+
+def library_data(tracks, seed=0, tracks_per_album=10, albums_per_artist=4):
+    """
+    Return the keyword arguments of a synthetic library of ``tracks``
+    tracks, with albums and artists shared between them the way they are in
+    real collections.
+
+    :rtype: list of dicts, albums and artists nested as dicts
+    """
+    rnd = random.Random(seed)
+    num_albums = max(1, tracks // tracks_per_album)
+    num_artists = max(1, num_albums // albums_per_artist)
+    artists = [
+        {
+            "uri": f"local:artist:{i}",
+            "name": f"Artist {i}",
+            "musicbrainz_id": f"{rnd.getrandbits(128):032x}",
+        }
+        for i in range(num_artists)
+    ]
+    albums = [
+        {
+            "uri": f"local:album:{i}",
+            "name": f"Album {i}",
+            "artists": [artists[i % num_artists]],
+            "num_tracks": tracks_per_album,
+            "date": str(1960 + rnd.randrange(60)),
+        }
+        for i in range(num_albums)
+    ]
+    data = []
+    for i in range(tracks):
+        album = albums[i % num_albums]
+        track = {
+            "uri": f"local:track:{i}",
+            "name": f"Track {i}",
+            "artists": album["artists"],
+            "album": album,
+            "track_no": i // num_albums + 1,
+            "genre": rnd.choice(("Rock", "Jazz", "Pop", "Classical")),
+            "length": rnd.randrange(60000, 600000),
+            "bitrate": rnd.choice((128, 192, 256, 320)),
+            "date": album["date"],
+        }
+        if rnd.random() < 0.2:
+            track["composers"] = [rnd.choice(artists)]
+        data.append(track)
+    return data
+
+
+def _artist(kwargs):
+    return models.Artist(**kwargs)
+
+
+def _album(kwargs):
+    kwargs = dict(kwargs)
+    kwargs["artists"] = [_artist(a) for a in kwargs.get("artists", ())]
+    return models.Album(**kwargs)
+
+
+def _track(kwargs):
+    kwargs = dict(kwargs)
+    for key in ("artists", "composers", "performers"):
+        if key in kwargs:
+            kwargs[key] = [_artist(a) for a in kwargs[key]]
+    if "album" in kwargs:
+        kwargs["album"] = _album(kwargs["album"])
+    return models.Track(**kwargs)
+
+
+def build_tracks(data):
+    """Construct :class:`~mopidy_client.models.Track` models from ``data``."""
+    return [_track(kwargs) for kwargs in data]
+
+
+def _clear_hashes(objects):
+    for obj in objects:
+        try:
+            object.__delattr__(obj, "_hash")
+        except AttributeError:
+            pass
+
+
+# Each case maps a name to (setup, run). setup receives the library data and
+# run, which is timed, what setup returned. Cases constructing models get no
+# live models from setup, so they measure the memo misses of a cold start.
+CASES = {
+    "construct.artist": (
+        lambda data: [t["album"]["artists"][0] for t in data],
+        lambda artists: [_artist(a) for a in artists],
+    ),
+    "construct.album": (
+        lambda data: [t["album"] for t in data],
+        lambda albums: [_album(a) for a in albums],
+    ),
+    "construct.track": (
+        lambda data: data,
+        build_tracks,
+    ),
+    "construct.tltrack": (
+        lambda data: build_tracks(data),
+        lambda tracks: [models.TlTrack(tlid=i, track=t) for i, t in enumerate(tracks)],
+    ),
+    "construct.playlist": (
+        lambda data: build_tracks(data),
+        lambda tracks: [
+            models.Playlist(uri=f"local:playlist:{i}", tracks=tracks[i : i + 100])
+            for i in range(0, len(tracks), 100)
+        ],
+    ),
+    "construct.search_result": (
+        lambda data: build_tracks(data),
+        lambda tracks: models.SearchResult(
+            uri="local:search",
+            tracks=tracks,
+            albums={t.album for t in tracks},
+            artists={a for t in tracks for a in t.artists},
+        ),
+    ),
+    "decode.tracks": (
+        lambda data: json.dumps(build_tracks(data), cls=models.ModelJSONEncoder),
+        lambda text: json.loads(text, object_hook=models.model_json_decoder),
+    ),
+    "replace.track": (
+        lambda data: build_tracks(data),
+        lambda tracks: [t.replace(name="Renamed") for t in tracks],
+    ),
+    "replace.memo_hit": (
+        lambda data: build_tracks(data),
+        lambda tracks: [t.replace(name=t.name) for t in tracks],
+    ),
+    "hash.track": (
+        lambda data: build_tracks(data),
+        lambda tracks: (_clear_hashes(tracks), [hash(t) for t in tracks]),
+    ),
+    "eq.track": (
+        lambda data: [(t, t.replace(comment="different")) for t in build_tracks(data)],
+        lambda pairs: [a == b for a, b in pairs],
+    ),
+    "serialize.track": (
+        lambda data: build_tracks(data),
+        lambda tracks: [t.serialize() for t in tracks],
+    ),
+    "encode.tracks": (
+        lambda data: build_tracks(data),
+        lambda tracks: json.dumps(tracks, cls=models.ModelJSONEncoder),
+    ),
+}
+
+
+def _time(run, state, repeat):
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = run(state)
+        elapsed = time.perf_counter() - start
+        # Drop the result outside the timing so memoized models are freed
+        del result
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _peak_memory(run, state):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = run(state)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, cases=None, repeat=5, seed=0, log=None):
+    """
+    Run the benchmark ``cases`` (all by default) for every library size.
+
+    :rtype: dict mapping ``"case/size"`` to a dict of ``seconds``,
+        ``per_item`` seconds and ``peak_bytes``
+    """
+    results = {}
+    for size in sizes:
+        data = library_data(size, seed=seed)
+        for name, (setup, run) in CASES.items():
+            if cases and not any(name.startswith(case) for case in cases):
+                continue
+            state = setup(data)
+            seconds = _time(run, state, repeat)
+            result = {
+                "seconds": seconds,
+                "per_item": seconds / size,
+                "peak_bytes": _peak_memory(run, state),
+            }
+            results[f"{name}/{size}"] = result
+            if log is not None:
+                log(name, size, result)
+            del state
+    return results
+
+
+def compare(results, baseline, threshold=0.1):
+    """
+    Compare ``results`` to a ``baseline`` from a previous run.
+
+    :rtype: list of ``(key, ratio, regressed)`` for the keys in both, where
+        ratio is the new time divided by the baseline time
+    """
+    rows = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        ratio = result["seconds"] / base["seconds"]
+        rows.append((key, ratio, ratio > 1 + threshold))
+    return rows
+
+
+def _format_bytes(size):
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+def _print_result(name, size, result):
+    print(
+        f"{name:<24} {size:>7} {result['seconds'] * 1000:>10.2f} ms "
+        f"{result['per_item'] * 1e6:>8.2f} us/item "
+        f"{_format_bytes(result['peak_bytes']):>10} peak",
+        flush=True,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "--sizes",
+        default=",".join(str(s) for s in DEFAULT_SIZES),
+        help="comma separated library sizes in tracks",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--case", action="append", help="only run cases starting with this"
+    )
+    parser.add_argument("--save", metavar="PATH", help="write results as JSON")
+    parser.add_argument("--compare", metavar="PATH", help="compare to saved results")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="relative slowdown reported as a regression",
+    )
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    results = run_benchmarks(
+        sizes, args.case, args.repeat, args.seed, log=_print_result
+    )
+
+    if args.save:
+        with open(args.save, "w") as fh:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "results": results,
+                },
+                fh,
+                indent=2,
+            )
+
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)["results"]
+        regressions = 0
+        print()
+        for key, ratio, regressed in compare(results, baseline, args.threshold):
+            marker = "  REGRESSION" if regressed else ""
+            print(f"{key:<32} {ratio:>6.2f}x{marker}")
+            regressions += regressed
+        if regressions:
+            print(f"\n{regressions} regression(s) over {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1 +1,30 @@
-from .client import Client
+import importlib
+
+# Spelled out instead of importing typing, which type checkers understand too
+TYPE_CHECKING = False
+if TYPE_CHECKING:  # pragma: no cover
+    from .client import Client
+    from .threaded import ThreadedClient
+
+__all__ = ["Client", "ThreadedClient"]
+
+# Imported on first access, so tools importing a single submodule don't pay
+# for the client, its controllers and the models up front.
+_LAZY = {
+    "Client": "mopidy_client.client:Client",
+    "ThreadedClient": "mopidy_client.threaded:ThreadedClient",
+}
+
+
+def __getattr__(name):
+    try:
+        module_name, attr = _LAZY[name].split(":")
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), attr)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
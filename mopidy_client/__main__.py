@@ -0,0 +1,5 @@
+import sys
+
+from mopidy_client.cli import main
+
+sys.exit(main())
@@ -0,0 +1,95 @@
+import asyncio
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def chunked(items, size):
+    """Split ``items`` into lists of at most ``size`` elements."""
+    items = list(items)
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+class PipelineError(Exception):
+
+    """
+    Raised by :func:`pipeline` when a call failed, with the failure as its
+    ``__cause__``.
+
+    :param index: index of the first failed call
+    :param results: results of the calls that completed, in the order of
+        the calls, with :class:`None` for calls that failed or weren't
+        started
+    """
+
+    def __init__(self, message, index, results):
+        super().__init__(message)
+        self.index = index
+        self.results = results
+
+
+async def pipeline(calls, window=4, progress=None, weights=None):
+    """
+    Await the coroutine functions in ``calls`` with at most ``window`` of
+    them in flight.
+
+    Calls are started strictly in order. Since the server handles the
+    requests of one connection in the order they were sent, operations that
+    depend on ordering (such as appending to the tracklist) keep it. Once a
+    call fails no further calls are started; the ones already in flight
+    still complete before :class:`PipelineError` is raised.
+
+    :param calls: list of coroutine functions taking no arguments
+    :param window: maximum number of outstanding calls
+    :param progress: optional callable receiving ``(done, total)`` as calls
+        complete, counted in ``weights``
+    :param weights: optional list giving the amount of work per call,
+        defaults to one per call
+    :rtype: list of results in the order of ``calls``
+    :raises PipelineError: if a call failed
+    """
+    if weights is None:
+        weights = [1] * len(calls)
+    total = sum(weights)
+    done = 0
+    failed = False
+    results = [None] * len(calls)
+    semaphore = asyncio.Semaphore(window)
+
+    async def run(index, call):
+        nonlocal done, failed
+        try:
+            results[index] = await call()
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            semaphore.release()
+        done += weights[index]
+        if progress is not None:
+            progress(done, total)
+
+    tasks = []
+    try:
+        for index, call in enumerate(calls):
+            await semaphore.acquire()
+            if failed:
+                break
+            tasks.append(asyncio.ensure_future(run(index, call)))
+            # Give the task a chance to send its request before the next one
+            await asyncio.sleep(0)
+        outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+    for index, outcome in enumerate(outcomes):
+        if isinstance(outcome, BaseException):
+            _LOGGER.debug("Stopped pipeline after call %d failed", index)
+            raise PipelineError(
+                f"Call {index + 1} of {len(calls)} failed: {outcome!r}",
+                index,
+                results,
+            ) from outcome
+    return results
@@ -0,0 +1,81 @@
+import collections
+
+_MISSING = object()
+
+
+class LRUCache:
+
+    """
+    Size-bounded mapping evicting the least recently used entry first.
+
+    :param maxsize: maximum total size of the entries kept
+    :param sizeof: optional callable returning the size of a value, by
+        default every entry has a size of one
+    """
+
+    def __init__(self, maxsize=1024, sizeof=None):
+        self.maxsize = maxsize
+        self.sizeof = sizeof
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._data = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        value = self._data.get(key, _MISSING)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._data.move_to_end(key)
+        return value
+
+    def _sizeof(self, value):
+        return 1 if self.sizeof is None else self.sizeof(value)
+
+    def set(self, key, value):
+        self.pop(key)
+        self._data[key] = value
+        self.size += self._sizeof(value)
+        while self.size > self.maxsize and self._data:
+            _, evicted = self._data.popitem(last=False)
+            self.size -= self._sizeof(evicted)
+
+    def pop(self, key, default=None):
+        value = self._data.pop(key, _MISSING)
+        if value is _MISSING:
+            return default
+        self.size -= self._sizeof(value)
+        return value
+
+    def clear(self):
+        self._data.clear()
+        self.size = 0
+
+
+class LibraryCache:
+
+    """
+    Per URI cache of ``core.library`` results shared by a client.
+
+    :param maxsize: maximum number of URIs kept per result type
+    """
+
+    def __init__(self, maxsize=1024):
+        #: Maps a URI to the list of :class:`~mopidy_client.models.Track`
+        #: returned by ``core.library.lookup``.
+        self.tracks = LRUCache(maxsize)
+
+        #: Maps a URI to the list of :class:`~mopidy_client.models.Image`
+        #: returned by ``core.library.get_images``.
+        self.images = LRUCache(maxsize)
+
+    def clear(self):
+        self.tracks.clear()
+        self.images.clear()
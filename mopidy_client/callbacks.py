@@ -1,5 +1,14 @@
-from typing_extensions import Protocol
-from mopidy_client import models
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+try:
+    from typing import Protocol
+except ImportError:  # Python < 3.8
+    from typing_extensions import Protocol
+
+if TYPE_CHECKING:  # pragma: no cover
+    from mopidy_client import models
 
 
 class MuteChanged(Protocol):
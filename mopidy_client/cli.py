@@ -0,0 +1,119 @@
+"""
+Command line interface for one-off requests, e.g.::
+
+    mopidy-client call core.playback.pause
+    mopidy-client call core.mixer.set_volume volume=30
+    mopidy-client call core.tracklist.add 'uris=["local:track:a.mp3"]'
+
+Parameters are given as ``name=value`` where value is parsed as JSON when
+possible and used as a string otherwise. Results are printed as JSON.
+
+Startup is kept short for cron jobs and scripts: the client is only imported
+once the arguments are parsed, and the default ``asyncio`` transport avoids
+importing tornado's websocket stack.
+"""
+
+import argparse
+import os
+import sys
+
+DEFAULT_URL = "ws://localhost:6680/mopidy/ws"
+
+
+def _param(text):
+    name, sep, value = text.partition("=")
+    if not sep or not name:
+        raise argparse.ArgumentTypeError(f"expected name=value, not {text!r}")
+    import json
+
+    try:
+        value = json.loads(value)
+    except ValueError:
+        pass  # plain strings don't need quoting
+    return name, value
+
+
+def _parser():
+    parser = argparse.ArgumentParser(
+        prog="mopidy-client", description="Send requests to a Mopidy server."
+    )
+    parser.add_argument(
+        "--url",
+        default=os.environ.get("MOPIDY_URL", DEFAULT_URL),
+        help="websocket URL, defaults to $MOPIDY_URL or %(default)s",
+    )
+    parser.add_argument(
+        "--transport",
+        default="asyncio",
+        choices=("asyncio", "tornado"),
+        help="websocket implementation, defaults to %(default)s",
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=10.0, help="seconds to wait for the server"
+    )
+    parser.add_argument(
+        "--compact", action="store_true", help="print JSON on a single line"
+    )
+    commands = parser.add_subparsers(dest="command", metavar="command")
+    commands.required = True
+
+    call = commands.add_parser("call", help="call a JSON-RPC method")
+    call.add_argument("method", help="method name, the core. prefix is optional")
+    call.add_argument("params", nargs="*", type=_param, metavar="name=value")
+
+    commands.add_parser("version", help="print the server version")
+    commands.add_parser("describe", help="print the server's API description")
+    return parser
+
+
+async def _run(args):
+    import asyncio
+
+    from mopidy_client.client import Client
+
+    if args.command == "call":
+        method = args.method
+        if not method.startswith("core."):
+            method = f"core.{method}"
+        params = dict(args.params)
+    elif args.command == "version":
+        method, params = "core.get_version", {}
+    else:
+        method, params = "core.describe", {}
+
+    client = Client(args.url, auto_reconnect=False, retries=1, transport=args.transport)
+    await client.connect(connect_timeout=args.timeout)
+    try:
+        return await asyncio.wait_for(client.call(method, **params), args.timeout)
+    finally:
+        await client.disconnect()
+
+
+def main(argv=None):
+    args = _parser().parse_args(argv)
+
+    import asyncio
+    import json
+
+    from mopidy_client.client import JsonRpcException, NotConnectedError
+    from mopidy_client.models import ModelJSONEncoder
+
+    try:
+        result = asyncio.run(_run(args))
+    except JsonRpcException as ex:
+        print(f"Error {ex.code}: {ex.message}", file=sys.stderr)
+        detail = ex.data.get("message") if isinstance(ex.data, dict) else ex.data
+        if detail and detail != ex.message:
+            print(detail, file=sys.stderr)
+        return 1
+    except (NotConnectedError, OSError) as ex:
+        print(f"Could not connect to {args.url}: {ex}", file=sys.stderr)
+        return 2
+    except asyncio.TimeoutError:
+        print(f"No answer from {args.url} within {args.timeout}s", file=sys.stderr)
+        return 2
+
+    if result is not None:
+        indent = None if args.compact else 2
+        print(json.dumps(result, cls=ModelJSONEncoder, indent=indent))
+    return 0
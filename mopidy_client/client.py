@@ -1,13 +1,18 @@
 import asyncio
 import json
 import logging
+import time
 from typing import Callable
 from functools import partial
 
 from mopidy_client import models, core
-from tornado import websocket, escape, gen
-from tornado.httpclient import HTTPClientError, HTTPRequest
 
+from .cache import LibraryCache
+from .dispatch import DROP_OLDEST, EventDispatcher
+from .keepalive import Keepalive
+from .loader import LibraryLoader
+from .metrics import timed_loads
+from .transport import TransportError, get_transport
 from .callbacks import (
     MuteChanged,
     PlaybackStateChanged,
@@ -30,10 +35,17 @@ class NotConnectedError(Exception):
 
 class JsonRpcException(Exception):
     def __init__(self, error):
-        super().__init__(error["data"]["traceback"])
+        # Application errors carry a dict with the traceback, protocol
+        # errors a string or no data at all
+        data = error.get("data")
+        if isinstance(data, dict):
+            detail = data.get("traceback") or data.get("message")
+        else:
+            detail = data
+        super().__init__(detail or error["message"])
         self.code = error["code"]
         self.message = error["message"]
-        self.data = error["data"]
+        self.data = data
 
 
 class Client:
@@ -50,15 +62,42 @@ class Client:
         await client.connect(**kwargs)
         return await client.version()
 
-    def __init__(self, ws_url, auto_reconnect=True, retries=3):
+    def __init__(
+        self,
+        ws_url,
+        auto_reconnect=True,
+        retries=3,
+        executor=None,
+        cache_size=1024,
+        describe_cache=None,
+        transport="tornado",
+        ping_interval=None,
+        ping_timeout=None,
+        max_missed_pongs=2,
+        metrics=None,
+    ):
         self._ws_url = ws_url
+        if isinstance(transport, str):
+            transport = get_transport(transport)
+        self._transport_factory = transport
+        self._transport = None
+        self._compression = None
         self._connected = False
         self._connect_args = {}
         self._auto_reconnect = auto_reconnect
-        self._listeners = {}
+        self._metrics = metrics
+        self._dispatcher = EventDispatcher(executor=executor, metrics=metrics)
         self._retries = retries
+        self.cache = LibraryCache(cache_size)
+        self._describe_cache = describe_cache
+        self._described = False
+        self._keepalive = None
+        if ping_interval:
+            self._keepalive = Keepalive(ping_interval, ping_timeout, max_missed_pongs)
 
         self._req = {}
+        # Method names by request id, only tracked when metrics are enabled
+        self._req_methods = {}
         self.core = core.CoreController(self)
         self.history = core.HistoryController(self)
         self.library = core.LibraryController(self)
@@ -66,84 +105,150 @@ class Client:
         self.playback = core.PlaybackController(self)
         self.playlists = core.PlaylistsController(self)
         self.tracklist = core.TracklistController(self)
-
-    def on_event(self, event, handler) -> Callable[[], None]:
-        def unsub():
-            self._listeners[event].remove(handler)
-
-        self._listeners.setdefault(event, [])
-        self._listeners[event].append(handler)
-
-        return unsub
-
-    def on_mute_changed(self, handler: MuteChanged) -> Callable[[], None]:
-        return self.on_event("mute_changed", handler)
-
-    def on_options_changed(self, handler: VoidCallback) -> Callable[[], None]:
-        return self.on_event("options_changed", handler)
+        self.loader = LibraryLoader(self)
+
+    def on_event(self, event, handler, **options) -> Callable[[], None]:
+        """
+        Register ``handler`` to be called with the data of every ``event``.
+
+        Handlers may be plain functions or coroutine functions. Each handler
+        receives events in the order they arrived from its own bounded queue,
+        so a slow handler never delays the others.
+
+        :param maxsize: maximum number of events queued for the handler
+        :param overflow: :data:`~mopidy_client.dispatch.DROP_OLDEST` or
+            :data:`~mopidy_client.dispatch.DROP_NEWEST`
+        :param threaded: run a sync handler in the client's executor
+        :param coalesce: only keep the latest event queued while the handler
+            is busy
+        :param debounce: deliver the last event of a burst once no new event
+            arrived for this many seconds
+        :param throttle: deliver at most one event per this many seconds,
+            always ending a burst with its latest event
+        :rtype: callable removing the handler again
+        """
+        listener = self._dispatcher.subscribe(event, handler, **options)
+        return partial(self._dispatcher.unsubscribe, listener)
+
+    def events(self, *events, maxsize=100, overflow=DROP_OLDEST):
+        """
+        Return an :class:`~mopidy_client.dispatch.EventStream` yielding
+        ``events`` as they arrive, or every event if none are given.
+
+        Close the stream (or use it as an async context manager) to
+        unsubscribe.
+        """
+        return self._dispatcher.stream(events, maxsize=maxsize, overflow=overflow)
+
+    @property
+    def transport_stats(self):
+        """:class:`~mopidy_client.transport.TransportStats` of the connection."""
+        if self._transport is None:
+            return None
+        return self._transport.stats
+
+    @property
+    def rtt(self):
+        """
+        :class:`~mopidy_client.keepalive.RttStats` of the keepalive pings,
+        or :class:`None` when ``ping_interval`` is not set.
+        """
+        if self._keepalive is None:
+            return None
+        return self._keepalive.rtt
+
+    @property
+    def metrics(self):
+        """The :class:`~mopidy_client.metrics.MetricsHook` given, if any."""
+        return self._metrics
+
+    def event_stats(self):
+        return self._dispatcher.stats()
+
+    def on_mute_changed(self, handler: MuteChanged, **options) -> Callable[[], None]:
+        return self.on_event("mute_changed", handler, **options)
+
+    def on_options_changed(
+        self, handler: VoidCallback, **options
+    ) -> Callable[[], None]:
+        return self.on_event("options_changed", handler, **options)
 
     def on_playback_state_changed(
-        self, handler: PlaybackStateChanged
+        self, handler: PlaybackStateChanged, **options
     ) -> Callable[[], None]:
-        return self.on_event("playback_state_changed", handler)
+        return self.on_event("playback_state_changed", handler, **options)
 
-    def on_playlist_changed(self, handler: PlaylistChanged) -> Callable[[], None]:
-        return self.on_event("playlist_changed", handler)
+    def on_playlist_changed(
+        self, handler: PlaylistChanged, **options
+    ) -> Callable[[], None]:
+        return self.on_event("playlist_changed", handler, **options)
 
-    def on_playlist_deleted(self, handler: PlaylistDeleted) -> Callable[[], None]:
-        return self.on_event("playlist_deleted", handler)
+    def on_playlist_deleted(
+        self, handler: PlaylistDeleted, **options
+    ) -> Callable[[], None]:
+        return self.on_event("playlist_deleted", handler, **options)
 
-    def on_playlists_loaded(self, handler: VoidCallback) -> Callable[[], None]:
-        return self.on_event("playlists_loaded", handler)
+    def on_playlists_loaded(
+        self, handler: VoidCallback, **options
+    ) -> Callable[[], None]:
+        return self.on_event("playlists_loaded", handler, **options)
 
-    def on_seeked(self, handler: Seeked) -> Callable[[], None]:
-        return self.on_event("seeked", handler)
+    def on_seeked(self, handler: Seeked, **options) -> Callable[[], None]:
+        return self.on_event("seeked", handler, **options)
 
     def on_stream_title_changed(
-        self, handler: StreamTitleChanged
+        self, handler: StreamTitleChanged, **options
     ) -> Callable[[], None]:
-        return self.on_event("stream_title_changed", handler)
+        return self.on_event("stream_title_changed", handler, **options)
 
     def on_track_playback_ended(
-        self, handler: TrackPlaybackChanged
+        self, handler: TrackPlaybackChanged, **options
     ) -> Callable[[], None]:
-        return self.on_event("track_playback_ended", handler)
+        return self.on_event("track_playback_ended", handler, **options)
 
     def on_track_playback_paused(
-        self, handler: TrackPlaybackChanged
+        self, handler: TrackPlaybackChanged, **options
     ) -> Callable[[], None]:
-        return self.on_event("track_playback_paused", handler)
+        return self.on_event("track_playback_paused", handler, **options)
 
     def on_track_playback_resumed(
-        self, handler: TrackPlaybackChanged
+        self, handler: TrackPlaybackChanged, **options
     ) -> Callable[[], None]:
-        return self.on_event("track_playback_resumed", handler)
+        return self.on_event("track_playback_resumed", handler, **options)
 
     def on_track_playback_started(
-        self, handler: TrackPlaybackStarted
+        self, handler: TrackPlaybackStarted, **options
     ) -> Callable[[], None]:
         _LOGGER.debug(
             "Subscribing %s: %s", handler, asyncio.iscoroutinefunction(handler)
         )
-        return self.on_event("track_playback_started", handler)
+        return self.on_event("track_playback_started", handler, **options)
 
-    def on_tracklist_changed(self, handler: VoidCallback) -> Callable[[], None]:
-        return self.on_event("tracklist_changed", handler)
+    def on_tracklist_changed(
+        self, handler: VoidCallback, **options
+    ) -> Callable[[], None]:
+        return self.on_event("tracklist_changed", handler, **options)
 
-    def on_volume_changed(self, handler: VolumeChanged) -> Callable[[], None]:
-        return self.on_event("volume_changed", handler)
+    def on_volume_changed(
+        self, handler: VolumeChanged, **options
+    ) -> Callable[[], None]:
+        return self.on_event("volume_changed", handler, **options)
 
     async def _connect(self):
         for i in range(self._retries):
             try:
-                request = HTTPRequest(self._ws_url, **self._connect_args)
-                self._ws = await websocket.websocket_connect(
-                    request, on_message_callback=self.on_message
+                transport = self._transport_factory()
+                await transport.connect(
+                    self._ws_url, compression=self._compression, **self._connect_args
                 )
+                self._transport = transport
+                self._reader = asyncio.ensure_future(self._read_loop(transport))
+                if self._keepalive is not None:
+                    self._keepalive.start(transport, self._connection_dead)
                 _LOGGER.info("Connected to %s", self._ws_url)
                 self._connected = True
                 break
-            except HTTPClientError as ex:
+            except TransportError as ex:
                 _LOGGER.warn(
                     "Failed connecting to %s received HTTP %s", self._ws_url, ex.code
                 )
@@ -154,41 +259,138 @@ class Client:
                 f"Failed to connect to {self._ws_url} retry timeout"
             )
 
-    async def connect(self, **kwargs):
+    async def connect(self, compression=None, **kwargs):
+        """
+        Connect to the server.
+
+        :param compression: negotiate permessage-deflate when set, either
+            ``True`` or a dict of ``compression_level``, ``mem_level`` and
+            ``threshold`` (see :class:`~mopidy_client.transport.Transport`)
+        :param kwargs: transport specific connect options
+        """
+        if compression is True:
+            compression = {}
         kwargs["follow_redirects"] = False
         self._connect_args = kwargs
+        self._compression = compression
         await self._connect()
+        if self._describe_cache is not None and not self._described:
+            await self.describe()
+
+    async def describe(self, refresh=False):
+        """
+        Generate typed controller methods from ``core.describe``.
+
+        The description is read from and stored to ``describe_cache`` when
+        the client was given one, avoiding the round-trip on later startups.
+        """
+        from .describe import apply_description, load_description
+
+        description = await load_description(
+            self, self._describe_cache, refresh=refresh
+        )
+        apply_description(self, description)
+        self._described = True
+        return description
 
     async def disconnect(self):
         self._connected = False
-        self._ws.close()
+        if self._keepalive is not None:
+            self._keepalive.stop()
+        self._transport.close()
+        self._fail_pending(NotConnectedError("Disconnected"))
 
     async def version(self):
         return await self.core.get_version()
 
     async def dispatch(self, event, data):
-        if event in self._listeners:
-            _LOGGER.debug("Dispatching event %s", event)
-            await asyncio.gather(
-                *[listener(**data) for listener in self._listeners[event]]
-            )
+        self._dispatcher.dispatch(event, data)
+
+    async def _read_loop(self, transport):
+        while True:
+            data = await transport.read()
+            if data is None:
+                # Connections replaced or closed on purpose were handled already
+                if transport is self._transport and self._connected:
+                    self._connection_lost()
+                break
+            try:
+                pending = self.on_message(data)
+                if pending is not None:
+                    await self._await_blocked(pending)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # One bad message must not stop reading the ones after it
+                _LOGGER.exception("Failed handling message from %s", self._ws_url)
+
+    async def _await_blocked(self, pending):
+        # Pongs aren't read meanwhile, so they must not count as missed
+        keepalive = self._keepalive
+        if keepalive is None:
+            return await pending
+        keepalive.block()
+        try:
+            return await pending
+        finally:
+            keepalive.unblock()
+
+    def _fail_pending(self, exc):
+        requests, self._req = self._req, {}
+        self._req_methods = {}
+        for fut in requests.values():
+            if not fut.done():
+                fut.set_exception(exc)
+
+    def _connection_lost(self):
+        _LOGGER.info("Disconnected from %s", self._ws_url)
+        # disconnect() clears _connected first, don't undo a deliberate close
+        was_connected, self._connected = self._connected, False
+        if self._keepalive is not None:
+            self._keepalive.stop()
+        self._fail_pending(NotConnectedError("Connection lost"))
+        if was_connected and self._auto_reconnect:
+            _LOGGER.info("Reconnecting")
+            asyncio.create_task(self._connect())
+
+    def _connection_dead(self, transport):
+        if transport is not self._transport:
+            return
+        _LOGGER.warning("No pong from %s, closing connection", self._ws_url)
+        self._connection_lost()
+        transport.close()
 
     def on_message(self, data):
         if not data:
-            _LOGGER.info("Disconnected from %s", self._ws_url)
-            self._connected = False
-            if self._auto_reconnect:
-                _LOGGER.info("Reconnecting")
-                asyncio.create_task(self._connect())
+            self._connection_lost()
             return
 
-        escape.native_str(data)
-        # TODO: catch parse exception
-        message = json.loads(data, object_hook=models.model_json_decoder)
+        metrics = self._metrics
+        try:
+            if metrics is None:
+                message = json.loads(data, object_hook=models.model_json_decoder)
+            else:
+                message, duration, model_duration, count = timed_loads(
+                    data, models.model_json_decoder
+                )
+                metrics.message_decoded(len(data), duration, model_duration, count)
+        except ValueError:
+            _LOGGER.warning("Ignoring malformed message: %.200s", data)
+            return
         if "jsonrpc" in message:
             if "id" in message:
-                if message["id"] in self._req:
-                    fut = self._req.pop(message["id"])
+                if metrics is not None:
+                    method = self._req_methods.pop(message["id"], None)
+                    if method is not None:
+                        metrics.response_received(method, len(data))
+                fut = self._req.pop(message["id"], None)
+                if fut is not None and fut.done():
+                    # The caller timed out or was cancelled
+                    _LOGGER.debug(
+                        "Dropping JSON-RPC Response %d to a cancelled request",
+                        message["id"],
+                    )
+                elif fut is not None:
                     if "error" in message:
                         fut.set_exception(JsonRpcException(message["error"]))
                     elif "result" in message:
@@ -209,7 +411,7 @@ class Client:
                 _LOGGER.warn("No ID set in incoming jsonrpc response")
         elif "event" in message:
             event = message.pop("event")
-            asyncio.create_task(self.dispatch(event, message))
+            return self._dispatcher.dispatch(event, message)
         else:
             _LOGGER.warn("Received unknown message: %s", data)
 
@@ -237,6 +439,29 @@ class Client:
             method,
             kwargs if bool(kwargs) else "",
         )
-        await self._ws.write_message(json.dumps(data))
-        result = await fut
-        return result
+        metrics = self._metrics
+        if metrics is not None:
+            return await self._call_measured(metrics, method, data, fut)
+
+        try:
+            await self._transport.write(json.dumps(data))
+            return await fut
+        finally:
+            # Gone already once answered, still there on errors and cancellation
+            self._req.pop(data["id"], None)
+
+    async def _call_measured(self, metrics, method, data, fut):
+        payload = json.dumps(data)
+        self._req_methods[data["id"]] = method
+        metrics.request_sent(method, len(payload))
+        start = time.perf_counter()
+        error = True
+        try:
+            await self._transport.write(payload)
+            result = await fut
+            error = False
+            return result
+        finally:
+            self._req.pop(data["id"], None)
+            self._req_methods.pop(data["id"], None)
+            metrics.request_finished(method, time.perf_counter() - start, error)
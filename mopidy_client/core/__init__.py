@@ -1,7 +1,21 @@
+import asyncio
+import logging
+from functools import partial
+
+from mopidy_client.bulk import PipelineError, chunked, pipeline
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _flatten(results):
+    return [tl_track for result in results for tl_track in result or ()]
+
+
 class BaseController:
     def __init__(self, name, client):
         self._name = name
         self._client = client
+        self._described = False
 
     def call(self, method, **kwargs):
         if self._name != "":
@@ -11,11 +25,21 @@ class BaseController:
 
         return self._client.call(method, **kwargs)
 
-    def __getattr__(self, method_name, **kwargs):
-        def meth(self, **kwargs):
+    def __getattr__(self, method_name):
+        if method_name.startswith("_"):
+            raise AttributeError(method_name)
+        if self._described:
+            # The server's description is complete, so this is a typo
+            raise AttributeError(f"{type(self).__name__} has no method {method_name!r}")
+
+        def meth(**kwargs):
             return self.call(method_name, **kwargs)
 
-        return meth.__get__(self)
+        # Cache on the instance so later lookups skip __getattr__ entirely.
+        # Methods generated from core.describe replace these.
+        meth.__name__ = method_name
+        setattr(self, method_name, meth)
+        return meth
 
 
 class CoreController(BaseController):
@@ -32,6 +56,51 @@ class LibraryController(BaseController):
     def __init__(self, client):
         super().__init__("library", client)
 
+    def crawl(self, **kwargs):
+        """
+        Asynchronously generate every track in the library, see
+        :class:`~mopidy_client.crawler.LibraryCrawler` for the arguments.
+        """
+        from mopidy_client.crawler import LibraryCrawler
+
+        return LibraryCrawler(self, **kwargs).crawl()
+
+    def search_stream(self, query, uris=None, exact=False):
+        """
+        Asynchronously generate :class:`~mopidy_client.models.SearchResult`
+        per URI scheme as they arrive, see :func:`~mopidy_client.search.search_stream`.
+        """
+        from mopidy_client.search import search_stream
+
+        return search_stream(self, query, uris=uris, exact=exact)
+
+    async def search_merged(self, query, uris=None, exact=False, timeout=None):
+        """
+        Search all backends concurrently and return one deduplicated and
+        ranked :class:`~mopidy_client.models.SearchResult`.
+
+        :param timeout: seconds to wait for slow backends; the results that
+            arrived in time are returned and the late responses ignored
+        """
+        from mopidy_client.search import SearchMerger
+
+        merger = SearchMerger(query)
+
+        async def consume():
+            stream = self.search_stream(query, uris=uris, exact=exact)
+            try:
+                async for result in stream:
+                    merger.add(result)
+            finally:
+                # Cancels the searches still running when timed out
+                await stream.aclose()
+
+        try:
+            await asyncio.wait_for(consume(), timeout)
+        except asyncio.TimeoutError:
+            _LOGGER.debug("Search timed out after %d results", merger.results)
+        return merger.result()
+
 
 class MixerController(BaseController):
     def __init__(self, client):
@@ -47,7 +116,100 @@ class PlaylistsController(BaseController):
     def __init__(self, client):
         super().__init__("playlists", client)
 
+    async def bulk_lookup(self, uris, window=4, progress=None):
+        """
+        Look up many playlists with up to ``window`` requests in flight.
+
+        :rtype: list of :class:`~mopidy_client.models.Playlist` (or
+            :class:`None`) in the order of ``uris``
+        """
+        calls = [partial(self.lookup, uri=uri) for uri in uris]
+        return await pipeline(calls, window=window, progress=progress)
+
+    async def bulk_save(self, playlists, window=4, progress=None):
+        """
+        Save many playlists with up to ``window`` requests in flight.
+
+        :rtype: list of saved :class:`~mopidy_client.models.Playlist` (or
+            :class:`None`) in the order of ``playlists``
+        """
+        calls = [partial(self.save, playlist=playlist) for playlist in playlists]
+        weights = [max(playlist.length, 1) for playlist in playlists]
+        return await pipeline(calls, window=window, progress=progress, weights=weights)
+
+    async def bulk_delete(self, uris, window=4, progress=None):
+        """
+        Delete many playlists with up to ``window`` requests in flight.
+
+        :rtype: list of booleans in the order of ``uris``
+        """
+        calls = [partial(self.delete, uri=uri) for uri in uris]
+        return await pipeline(calls, window=window, progress=progress)
+
 
 class TracklistController(BaseController):
     def __init__(self, client):
         super().__init__("tracklist", client)
+
+    async def bulk_add(
+        self, uris, at_position=None, chunk_size=250, window=4, progress=None
+    ):
+        """
+        Add a large number of URIs in chunks of ``chunk_size``, with up to
+        ``window`` chunks in flight, preserving the order of ``uris``.
+
+        When ``at_position`` is given the chunks are sent last to first and
+        all inserted at that position, so the result is correct even when
+        some URIs fail to resolve.
+
+        If a chunk fails no further chunks are sent, and the
+        :class:`~mopidy_client.bulk.PipelineError` raised holds the tracks
+        that were added as ``results``.
+
+        :param progress: optional callable receiving ``(done, total)`` URIs
+        :rtype: list of added :class:`~mopidy_client.models.TlTrack`
+        """
+        chunks = chunked(uris, chunk_size)
+        if at_position is not None:
+            chunks.reverse()
+
+        calls = [
+            partial(self.add, uris=chunk, at_position=at_position) for chunk in chunks
+        ]
+        weights = [len(chunk) for chunk in chunks]
+        try:
+            results = await pipeline(
+                calls, window=window, progress=progress, weights=weights
+            )
+        except PipelineError as ex:
+            if at_position is not None:
+                ex.results.reverse()
+            ex.results = _flatten(ex.results)
+            raise
+        if at_position is not None:
+            results.reverse()
+        return _flatten(results)
+
+    async def bulk_remove(self, tlids, chunk_size=250, window=4, progress=None):
+        """
+        Remove a large number of tracklist IDs in chunks of ``chunk_size``,
+        with up to ``window`` chunks in flight.
+
+        If a chunk fails no further chunks are sent, and the
+        :class:`~mopidy_client.bulk.PipelineError` raised holds the tracks
+        that were removed as ``results``.
+
+        :param progress: optional callable receiving ``(done, total)`` IDs
+        :rtype: list of removed :class:`~mopidy_client.models.TlTrack`
+        """
+        chunks = chunked(tlids, chunk_size)
+        calls = [partial(self.remove, criteria={"tlid": chunk}) for chunk in chunks]
+        weights = [len(chunk) for chunk in chunks]
+        try:
+            results = await pipeline(
+                calls, window=window, progress=progress, weights=weights
+            )
+        except PipelineError as ex:
+            ex.results = _flatten(ex.results)
+            raise
+        return _flatten(results)
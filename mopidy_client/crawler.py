@@ -0,0 +1,217 @@
+import asyncio
+import collections
+import json
+import logging
+import os
+import time
+
+from mopidy_client import models
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CrawlState:
+
+    """
+    Progress of a :class:`LibraryCrawler`, persisted as JSON between runs.
+
+    Directories and track URIs that are being worked on stay in the pending
+    lists until their results were handed to the consumer, so a resumed
+    crawl repeats at most the work that was in flight when it stopped.
+    """
+
+    def __init__(self, pending_dirs=None, pending_tracks=None, seen=None, done=0):
+        self.pending_dirs = collections.deque(pending_dirs or [])
+        self.pending_tracks = collections.deque(pending_tracks or [])
+        self.seen = set(seen or [])
+        self.done = done
+        self.in_flight_dirs = set()
+        self.in_flight_tracks = {}
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as fh:
+            data = json.load(fh)
+        return cls(**data)
+
+    def save(self, path):
+        data = {
+            "pending_dirs": list(self.in_flight_dirs) + list(self.pending_dirs),
+            "pending_tracks": [
+                uri for batch in self.in_flight_tracks.values() for uri in batch
+            ]
+            + list(self.pending_tracks),
+            "seen": sorted(self.seen),
+            "done": self.done,
+        }
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as fh:
+            json.dump(data, fh)
+        os.replace(tmp, path)
+
+
+class LibraryCrawler:
+
+    """
+    Walk ``core.library.browse`` breadth-first and stream every track.
+
+    Directories are browsed by up to ``concurrency`` workers at once, and
+    track refs are resolved with multi-URI ``core.library.lookup`` calls of
+    ``batch_size`` URIs. When ``checkpoint`` is set, progress is written to
+    that file every ``checkpoint_interval`` seconds and when the crawl stops,
+    and an existing checkpoint is resumed instead of starting over. The file
+    is removed once the crawl completes.
+
+    Usage::
+
+        async for track in LibraryCrawler(client.library).crawl():
+            ...
+
+    :param library: a :class:`~mopidy_client.core.LibraryController`
+    :param concurrency: maximum number of requests in flight
+    :param batch_size: number of track URIs per lookup call
+    :param checkpoint: path of the checkpoint file
+    :param checkpoint_interval: minimum seconds between checkpoint writes
+    :param follow: :class:`~mopidy_client.models.Ref` types to descend into
+    """
+
+    def __init__(
+        self,
+        library,
+        concurrency=4,
+        batch_size=50,
+        checkpoint=None,
+        checkpoint_interval=5.0,
+        follow=(models.Ref.DIRECTORY,),
+    ):
+        self._library = library
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.checkpoint = checkpoint
+        self.checkpoint_interval = checkpoint_interval
+        self.follow = tuple(follow)
+
+        self.state = None
+        self._last_save = 0.0
+
+    def _load_state(self):
+        if self.checkpoint and os.path.exists(self.checkpoint):
+            state = CrawlState.load(self.checkpoint)
+            _LOGGER.info(
+                "Resuming crawl with %d directories and %d tracks pending",
+                len(state.pending_dirs),
+                len(state.pending_tracks),
+            )
+            return state
+        # Browsing None lists the root directories of every backend
+        return CrawlState(pending_dirs=[None])
+
+    def _save_state(self, force=False):
+        if not self.checkpoint:
+            return
+        now = time.monotonic()
+        if force or now - self._last_save >= self.checkpoint_interval:
+            self.state.save(self.checkpoint)
+            self._last_save = now
+
+    async def crawl(self):
+        """Asynchronously generate :class:`~mopidy_client.models.Track`."""
+        self.state = state = self._load_state()
+        self._last_save = time.monotonic()
+        wakeup = asyncio.Condition()
+        results = asyncio.Queue(maxsize=self.concurrency)
+        workers = [
+            asyncio.ensure_future(self._worker(wakeup, results))
+            for _ in range(self.concurrency)
+        ]
+        finished = 0
+        try:
+            while finished < len(workers):
+                item = await results.get()
+                if item is None:
+                    finished += 1
+                    continue
+                if isinstance(item, Exception):
+                    raise item
+
+                batch_id, tracks = item
+                batch = state.in_flight_tracks[batch_id]
+                while batch:
+                    for track in tracks.get(batch[0], ()):
+                        yield track
+                    # Only now the consumer asked for more, so it has them all
+                    batch.popleft()
+                    state.done += 1
+                del state.in_flight_tracks[batch_id]
+                self._save_state()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            if finished == len(workers) and self.checkpoint:
+                if os.path.exists(self.checkpoint):
+                    os.remove(self.checkpoint)
+            else:
+                self._save_state(force=True)
+
+    def _next_work(self):
+        state = self.state
+        if len(state.pending_tracks) >= self.batch_size or (
+            state.pending_tracks and not state.pending_dirs
+        ):
+            count = min(self.batch_size, len(state.pending_tracks))
+            batch = collections.deque(
+                state.pending_tracks.popleft() for _ in range(count)
+            )
+            batch_id = object()
+            state.in_flight_tracks[batch_id] = batch
+            return self._lookup(batch_id, batch)
+        if state.pending_dirs:
+            uri = state.pending_dirs.popleft()
+            state.in_flight_dirs.add(uri)
+            return self._browse(uri)
+        return None
+
+    async def _worker(self, wakeup, results):
+        try:
+            while True:
+                async with wakeup:
+                    work = self._next_work()
+                    while work is None:
+                        if not self.state.in_flight_dirs:
+                            # Nothing left to browse, and nothing being browsed
+                            # can produce more work.
+                            wakeup.notify_all()
+                            await results.put(None)
+                            return
+                        await wakeup.wait()
+                        work = self._next_work()
+
+                result = await work
+                if result is not None:
+                    await results.put(result)
+
+                async with wakeup:
+                    wakeup.notify_all()
+        except asyncio.CancelledError:
+            raise
+        except Exception as ex:
+            await results.put(ex)
+
+    async def _browse(self, uri):
+        state = self.state
+        refs = await self._library.browse(uri=uri)
+        for ref in refs:
+            if ref.uri in state.seen:
+                continue
+            if ref.type == models.Ref.TRACK:
+                state.seen.add(ref.uri)
+                state.pending_tracks.append(ref.uri)
+            elif ref.type in self.follow:
+                state.seen.add(ref.uri)
+                state.pending_dirs.append(ref.uri)
+        state.in_flight_dirs.discard(uri)
+        return None
+
+    async def _lookup(self, batch_id, uris):
+        _LOGGER.debug("Looking up %d tracks", len(uris))
+        return batch_id, await self._library.lookup(uris=list(uris))
@@ -0,0 +1,140 @@
+import inspect
+import json
+import keyword
+import logging
+import os
+from functools import partial
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def build_method(name, params=(), description=None):
+    """
+    Generate a controller method for the JSON-RPC method ``name``.
+
+    ``params`` is the parameter list from ``core.describe``. The generated
+    function has the same parameter names and defaults, so calls with wrong
+    arguments raise :class:`TypeError` locally instead of after a round-trip.
+
+    :rtype: function or :class:`None` if the parameters can't be mapped
+    """
+    parameters = [inspect.Parameter("self", inspect.Parameter.POSITIONAL_OR_KEYWORD)]
+    kwargs_name = None
+    try:
+        for param in params:
+            if param.get("varargs"):
+                # JSON-RPC by-name calls have no place for positional extras
+                continue
+            if param.get("kwargs"):
+                kwargs_name = param.get("name")
+                kind = inspect.Parameter.VAR_KEYWORD
+            else:
+                kind = inspect.Parameter.POSITIONAL_OR_KEYWORD
+            default = param.get("default", inspect.Parameter.empty)
+            parameters.append(
+                inspect.Parameter(param.get("name"), kind, default=default)
+            )
+        signature = inspect.Signature(parameters)
+    except (AttributeError, TypeError, ValueError):
+        # Malformed entries, names that aren't identifiers, duplicates or
+        # misordered defaults
+        return None
+
+    def meth(self, *args, **kwargs):
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+        del arguments["self"]
+        arguments.update(arguments.pop(kwargs_name, {}))
+        return self.call(name, **arguments)
+
+    meth.__name__ = name
+    meth.__signature__ = signature
+    meth.__doc__ = description
+    return meth
+
+
+def apply_description(client, description):
+    """
+    Install generated methods for ``description``, the result of
+    ``core.describe``, on the controllers of ``client``.
+
+    The methods are bound to that client's controller instances, so clients
+    connected to servers with different extensions don't affect each other.
+    Methods written by hand on a controller are left alone, and looking up
+    a method the description doesn't list raises :class:`AttributeError`.
+
+    :rtype: number of methods installed
+    """
+    controllers = {
+        "": client.core,
+        "history": client.history,
+        "library": client.library,
+        "mixer": client.mixer,
+        "playback": client.playback,
+        "playlists": client.playlists,
+        "tracklist": client.tracklist,
+    }
+    for controller in controllers.values():
+        # Drop methods cached or generated for an earlier description
+        for name in [name for name in vars(controller) if not name.startswith("_")]:
+            delattr(controller, name)
+
+    count = 0
+    for full_name, spec in description.items():
+        parts = full_name.split(".")
+        if not isinstance(spec, dict):
+            continue
+        if parts[0] != "core" or len(parts) not in (2, 3):
+            continue
+        controller = controllers.get("" if len(parts) == 2 else parts[1])
+        if controller is None:
+            continue
+
+        name = parts[-1]
+        if not name.isidentifier() or keyword.iskeyword(name):
+            _LOGGER.debug("Not installing %s, not a valid name", full_name)
+            continue
+        if hasattr(type(controller), name):
+            continue
+
+        meth = build_method(name, spec.get("params", ()), spec.get("description"))
+        if meth is None:
+            _LOGGER.debug("No signature for %s, unsupported parameters", full_name)
+            meth = partial(controller.call, name)
+        else:
+            meth.__qualname__ = f"{type(controller).__name__}.{name}"
+            meth = meth.__get__(controller)
+        setattr(controller, name, meth)
+        count += 1
+
+    for controller in controllers.values():
+        controller._described = True
+    return count
+
+
+async def load_description(client, path=None, refresh=False):
+    """
+    Return the ``core.describe`` result for ``client``.
+
+    When ``path`` is set the description is read from that file instead of
+    asking the server, and written to it after asking.
+
+    :param refresh: ask the server even if ``path`` exists
+    """
+    if path is not None and not refresh:
+        try:
+            with open(path) as fh:
+                return json.load(fh)
+        except FileNotFoundError:
+            pass
+        except ValueError:
+            _LOGGER.warning("Ignoring corrupt description cache %s", path)
+
+    description = await client.call("core.describe")
+    if path is not None:
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as fh:
+            json.dump(description, fh)
+        os.replace(tmp, path)
+    return description
@@ -0,0 +1,482 @@
+import asyncio
+import collections
+import inspect
+import logging
+import time
+from functools import partial
+
+_LOGGER = logging.getLogger(__name__)
+
+#: Overflow policy discarding the oldest queued event to make room.
+DROP_OLDEST = "drop_oldest"
+
+#: Overflow policy discarding the incoming event when the queue is full.
+DROP_NEWEST = "drop_newest"
+
+#: Overflow policy making the producer wait for room. Only supported by
+#: :class:`EventStream`, where it applies backpressure to the connection.
+BLOCK = "block"
+
+OVERFLOW_POLICIES = (DROP_OLDEST, DROP_NEWEST)
+
+#: An event received from the server as yielded by :class:`EventStream`.
+Event = collections.namedtuple("Event", ["name", "data"])
+
+
+class ListenerStats:
+
+    """
+    Counters kept for every registered listener.
+
+    Latencies are measured in seconds from the moment the handler is invoked
+    until it (or its coroutine) returns.
+    """
+
+    __slots__ = [
+        "delivered",
+        "dropped",
+        "coalesced",
+        "errors",
+        "max_depth",
+        "latency_total",
+        "latency_max",
+    ]
+
+    def __init__(self):
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.max_depth = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    @property
+    def latency_avg(self):
+        if not self.delivered:
+            return 0.0
+        return self.latency_total / self.delivered
+
+    def as_dict(self):
+        data = {key: getattr(self, key) for key in self.__slots__}
+        data["latency_avg"] = self.latency_avg
+        return data
+
+
+class Listener:
+
+    """
+    A single handler registered for an event.
+
+    Every listener owns a bounded FIFO queue and drains it from at most one
+    worker task at a time, so events are delivered to the handler in the
+    order they were received, and a slow handler only ever delays itself.
+
+    :param event: name of the event the handler is registered for
+    :param handler: sync or async callable receiving the event data as kwargs
+    :param maxsize: maximum number of events queued for this handler
+    :param overflow: one of :data:`DROP_OLDEST` or :data:`DROP_NEWEST`
+    :param threaded: run a sync handler in the dispatcher's executor instead
+        of on the event loop
+    :param coalesce: keep only the latest queued event while the handler is
+        busy
+    :param debounce: seconds of quiet required before the latest event of a
+        burst is delivered
+    :param throttle: deliver at most one event per this many seconds; the
+        latest event of a burst is delivered at the end of the window
+    """
+
+    def __init__(
+        self,
+        dispatcher,
+        event,
+        handler,
+        maxsize=1000,
+        overflow=DROP_OLDEST,
+        threaded=False,
+        coalesce=False,
+        debounce=None,
+        throttle=None,
+    ):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(
+                f"Expected overflow to be one of {OVERFLOW_POLICIES}, "
+                f"not {overflow!r}"
+            )
+        if maxsize < 1:
+            raise ValueError(f"Expected maxsize to be at least 1, not {maxsize:d}")
+        if debounce is not None and throttle is not None:
+            raise ValueError("Expected only one of debounce or throttle")
+
+        self.event = event
+        self.handler = handler
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.threaded = threaded
+        self.coalesce = coalesce
+        self.debounce = debounce
+        self.throttle = throttle
+        self.stats = ListenerStats()
+
+        self._dispatcher = dispatcher
+        self._queue = collections.deque()
+        self._worker = None
+        self._active = True
+
+        # Burst state for debounce/throttle windows
+        self._pending = None
+        self._timer = None
+        self._last_emit = None
+
+    @property
+    def depth(self):
+        """Number of events waiting to be handled."""
+        return len(self._queue)
+
+    @property
+    def active(self):
+        return self._active
+
+    def put(self, data):
+        if not self._active:
+            return
+
+        if self.debounce is not None:
+            self._hold(data)
+            self._reschedule(self.debounce)
+        elif self.throttle is not None:
+            now = time.monotonic()
+            if self._timer is not None:
+                self._hold(data)
+            elif self._last_emit is None or now - self._last_emit >= self.throttle:
+                self._last_emit = now
+                self._enqueue(data)
+            else:
+                self._hold(data)
+                self._reschedule(self._last_emit + self.throttle - now)
+        else:
+            self._enqueue(data)
+
+    def _hold(self, data):
+        if self._pending is not None:
+            self.stats.coalesced += 1
+        self._pending = data
+
+    def _reschedule(self, delay):
+        if self._timer is not None:
+            self._timer.cancel()
+        loop = asyncio.get_running_loop()
+        self._timer = loop.call_later(delay, self._flush)
+
+    def _flush(self):
+        self._timer = None
+        data, self._pending = self._pending, None
+        if data is not None and self._active:
+            self._last_emit = time.monotonic()
+            self._enqueue(data)
+
+    def _enqueue(self, data):
+        if self.coalesce and self._queue:
+            self.stats.coalesced += len(self._queue)
+            self._queue.clear()
+
+        if len(self._queue) >= self.maxsize:
+            self.stats.dropped += 1
+            if self.overflow == DROP_NEWEST:
+                return
+            self._queue.popleft()
+
+        self._queue.append(data)
+        if len(self._queue) > self.stats.max_depth:
+            self.stats.max_depth = len(self._queue)
+
+        if self._worker is None:
+            self._worker = asyncio.ensure_future(self._drain())
+
+    def cancel(self):
+        self._active = False
+        self._queue.clear()
+        self._pending = None
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._worker is not None and self._worker is not asyncio.current_task():
+            # A handler unsubscribing itself finishes normally, the cleared
+            # queue ends the worker afterwards
+            self._worker.cancel()
+            self._worker = None
+
+    async def _drain(self):
+        try:
+            while self._queue:
+                await self._deliver(self._queue.popleft())
+        finally:
+            self._worker = None
+
+    async def _deliver(self, data):
+        start = time.monotonic()
+        error = False
+        try:
+            if self.threaded and not asyncio.iscoroutinefunction(self.handler):
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(
+                    self._dispatcher.executor, partial(self.handler, **data)
+                )
+            else:
+                result = self.handler(**data)
+                if inspect.isawaitable(result):
+                    await result
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            error = True
+            self.stats.errors += 1
+            _LOGGER.exception(
+                "Handler %s failed processing event %s", self.handler, self.event
+            )
+
+        elapsed = time.monotonic() - start
+        self.stats.delivered += 1
+        self.stats.latency_total += elapsed
+        if elapsed > self.stats.latency_max:
+            self.stats.latency_max = elapsed
+        metrics = self._dispatcher.metrics
+        if metrics is not None:
+            metrics.handler_finished(self.event, elapsed, error)
+
+
+class EventStream:
+
+    """
+    Asynchronous iterator over events backed by a bounded buffer.
+
+    Usage::
+
+        async with client.events("volume_changed", "seeked") as stream:
+            async for event in stream:
+                print(event.name, event.data)
+
+    :param events: names of the events to receive, all events if empty
+    :param maxsize: maximum number of buffered events
+    :param overflow: one of :data:`DROP_OLDEST`, :data:`DROP_NEWEST` or
+        :data:`BLOCK`. Blocking stalls reading from the connection, including
+        JSON-RPC responses, until the consumer catches up.
+    """
+
+    def __init__(self, dispatcher, events=(), maxsize=100, overflow=DROP_OLDEST):
+        if overflow not in OVERFLOW_POLICIES + (BLOCK,):
+            raise ValueError(
+                f"Expected overflow to be one of {OVERFLOW_POLICIES + (BLOCK,)}, "
+                f"not {overflow!r}"
+            )
+        if maxsize < 1:
+            raise ValueError(f"Expected maxsize to be at least 1, not {maxsize:d}")
+
+        self.events = tuple(events)
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.dropped = 0
+
+        self._dispatcher = dispatcher
+        self._buffer = collections.deque()
+        self._putters = collections.deque()
+        self._getter = None
+        self._closed = False
+
+    @property
+    def depth(self):
+        """Number of events waiting to be consumed."""
+        return len(self._buffer)
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def put(self, event, data):
+        if self._closed:
+            return None
+
+        item = Event(event, data)
+        if len(self._buffer) >= self.maxsize:
+            if self.overflow == BLOCK:
+                fut = asyncio.get_running_loop().create_future()
+                self._putters.append((fut, item))
+                return fut
+            self.dropped += 1
+            if self.overflow == DROP_NEWEST:
+                return None
+            self._buffer.popleft()
+
+        self._buffer.append(item)
+        self._wakeup()
+        return None
+
+    def _wakeup(self):
+        if self._getter is not None and not self._getter.done():
+            self._getter.set_result(None)
+
+    def get_nowait(self):
+        if not self._buffer:
+            raise asyncio.QueueEmpty()
+
+        item = self._buffer.popleft()
+        while self._putters and len(self._buffer) < self.maxsize:
+            fut, pending = self._putters.popleft()
+            self._buffer.append(pending)
+            if not fut.done():
+                fut.set_result(None)
+        return item
+
+    async def get(self):
+        while not self._buffer:
+            if self._closed:
+                raise StopAsyncIteration
+            self._getter = asyncio.get_running_loop().create_future()
+            try:
+                await self._getter
+            finally:
+                self._getter = None
+        return self.get_nowait()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._dispatcher.unsubscribe_stream(self)
+        while self._putters:
+            fut, _ = self._putters.popleft()
+            if not fut.done():
+                fut.set_result(None)
+        self._wakeup()
+
+    async def aclose(self):
+        self.close()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.get()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+
+class EventDispatcher:
+
+    """
+    Fan incoming events out to registered listeners.
+
+    :meth:`dispatch` never awaits handlers; it only appends the event to each
+    listener's queue. This keeps the number of pending tasks bounded by the
+    number of listeners no matter how many events arrive.
+
+    :param executor: :class:`concurrent.futures.Executor` used for threaded
+        listeners, :class:`None` uses the event loop's default executor
+    :param maxsize: default queue size for new listeners
+    :param overflow: default overflow policy for new listeners
+    :param metrics: optional :class:`~mopidy_client.metrics.MetricsHook`
+    """
+
+    def __init__(self, executor=None, maxsize=1000, overflow=DROP_OLDEST, metrics=None):
+        self.executor = executor
+        self.metrics = metrics
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self._listeners = {}
+        # Streams keyed by event name, None holds streams receiving all events
+        self._streams = {}
+
+    def subscribe(self, event, handler, **options):
+        options.setdefault("maxsize", self.maxsize)
+        options.setdefault("overflow", self.overflow)
+        listener = Listener(self, event, handler, **options)
+        self._listeners.setdefault(event, {})[listener] = None
+        return listener
+
+    def unsubscribe(self, listener):
+        listeners = self._listeners.get(listener.event, {})
+        listeners.pop(listener, None)
+        if not listeners:
+            self._listeners.pop(listener.event, None)
+        listener.cancel()
+
+    def stream(self, events=(), **options):
+        stream = EventStream(self, events, **options)
+        for event in stream.events or (None,):
+            self._streams.setdefault(event, {})[stream] = None
+        return stream
+
+    def unsubscribe_stream(self, stream):
+        for event in stream.events or (None,):
+            streams = self._streams.get(event, {})
+            streams.pop(stream, None)
+            if not streams:
+                self._streams.pop(event, None)
+
+    def listeners(self, event=None):
+        if event is not None:
+            return list(self._listeners.get(event, ()))
+        return [
+            listener for listeners in self._listeners.values() for listener in listeners
+        ]
+
+    def dispatch(self, event, data):
+        """
+        Queue ``event`` for every listener and stream subscribed to it.
+
+        :rtype: :class:`None`, or an awaitable when a blocking stream is full
+            and the caller should wait before reading further events
+        """
+        listeners = self._listeners.get(event)
+        if listeners:
+            _LOGGER.debug("Dispatching event %s", event)
+            for listener in tuple(listeners):
+                listener.put(data)
+
+        if self.metrics is not None:
+            count = len(listeners or ())
+            for key in (event, None):
+                count += len(self._streams.get(key, ()))
+            self.metrics.event_dispatched(event, count)
+
+        if not self._streams:
+            return None
+
+        blocked = []
+        for key in (event, None):
+            for stream in tuple(self._streams.get(key, ())):
+                fut = stream.put(event, data)
+                if fut is not None:
+                    blocked.append(fut)
+
+        if blocked:
+            return asyncio.gather(*blocked)
+        return None
+
+    def stats(self):
+        """
+        Return a snapshot of queue depth and handler latency per listener.
+
+        :rtype: dict mapping event name to a list of stats dicts
+        """
+        result = {}
+        for event, listeners in self._listeners.items():
+            result[event] = []
+            for listener in listeners:
+                stats = listener.stats.as_dict()
+                stats["handler"] = repr(listener.handler)
+                stats["depth"] = listener.depth
+                result[event].append(stats)
+        return result
+
+    def close(self):
+        for listener in self.listeners():
+            listener.cancel()
+        self._listeners.clear()
+        for streams in list(self._streams.values()):
+            for stream in list(streams):
+                stream.close()
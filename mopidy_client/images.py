@@ -0,0 +1,220 @@
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+from .cache import LRUCache
+
+try:
+    # libcurl keeps connections to the server alive between downloads
+    from tornado.curl_httpclient import CurlAsyncHTTPClient as _HTTPClient
+except ImportError:
+    from tornado.simple_httpclient import SimpleAsyncHTTPClient as _HTTPClient
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def best_image(images, width=None, height=None):
+    """
+    Pick the :class:`~mopidy_client.models.Image` best suited for displaying
+    at ``width`` x ``height``.
+
+    This is the smallest image at least as large as requested, or the
+    largest image if none is. Images without dimensions are only picked
+    when no image has any.
+
+    :rtype: :class:`~mopidy_client.models.Image` or :class:`None`
+    """
+    if not images:
+        return None
+
+    sized = [image for image in images if image.width and image.height]
+    if not sized:
+        return images[0]
+
+    def area(image):
+        return image.width * image.height
+
+    if width is None and height is None:
+        return max(sized, key=area)
+
+    large_enough = [
+        image
+        for image in sized
+        if (width is None or image.width >= width)
+        and (height is None or image.height >= height)
+    ]
+    if large_enough:
+        return min(large_enough, key=area)
+    return max(sized, key=area)
+
+
+class DiskCache:
+
+    """
+    Size-bounded directory of cached files evicting the least recently used
+    file first. Access times are tracked with the file modification time.
+
+    The methods block on disk I/O, :class:`ImageService` calls them in an
+    executor. They are safe to call from several threads at once.
+
+    :param path: directory to store the files in
+    :param maxsize: maximum total size of the files in bytes
+    """
+
+    def __init__(self, path, maxsize=256 * 1024 * 1024):
+        self.path = path
+        self.maxsize = maxsize
+        os.makedirs(path, exist_ok=True)
+        self._lock = threading.Lock()
+        self.size = sum(size for _, _, size in self._entries())
+
+    def _entries(self):
+        for entry in os.scandir(self.path):
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                stat = entry.stat()
+                yield entry.path, stat.st_mtime, stat.st_size
+
+    def _filename(self, key):
+        return os.path.join(self.path, hashlib.sha1(key.encode()).hexdigest())
+
+    def get(self, key):
+        filename = self._filename(key)
+        try:
+            with open(filename, "rb") as fh:
+                data = fh.read()
+        except FileNotFoundError:
+            return None
+        os.utime(filename)
+        return data
+
+    def set(self, key, data):
+        filename = self._filename(key)
+        # Serializes size accounting and eviction between executor threads
+        with self._lock:
+            if os.path.exists(filename):
+                self.size -= os.path.getsize(filename)
+            tmp = f"{filename}.tmp"
+            with open(tmp, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, filename)
+            self.size += len(data)
+            if self.size > self.maxsize:
+                self._evict()
+
+    def _evict(self):
+        for filename, _, size in sorted(self._entries(), key=lambda e: e[1]):
+            if self.size <= self.maxsize:
+                break
+            try:
+                os.remove(filename)
+            except FileNotFoundError:
+                continue
+            self.size -= size
+
+
+class ImageService:
+
+    """
+    Download artwork referenced by ``core.library.get_images`` results.
+
+    Images are downloaded with at most ``max_concurrency`` requests at once
+    and kept in a memory cache and, when ``cache_dir`` is set, a disk cache,
+    both keyed by image URI. Relative image URIs, as returned by Mopidy's
+    local backend, are resolved against the HTTP server the client is
+    connected to.
+
+    Usage::
+
+        images = ImageService(client, cache_dir="~/.cache/mopidy-client")
+        data = await images.fetch("local:album:foo", width=300, height=300)
+
+    :param client: a :class:`~mopidy_client.Client`
+    :param cache_dir: optional directory for the disk cache
+    :param memory_size: maximum bytes kept in the memory cache
+    :param disk_size: maximum bytes kept in the disk cache
+    :param max_concurrency: maximum number of simultaneous downloads
+    :param base_url: URL relative image URIs are resolved against, derived
+        from the client's websocket URL by default
+    :param http_client: optional tornado ``AsyncHTTPClient`` to download with
+    """
+
+    def __init__(
+        self,
+        client,
+        cache_dir=None,
+        memory_size=16 * 1024 * 1024,
+        disk_size=256 * 1024 * 1024,
+        max_concurrency=4,
+        base_url=None,
+        http_client=None,
+    ):
+        self._client = client
+        if base_url is None:
+            scheme, netloc, _, _, _ = urlsplit(client._ws_url)
+            scheme = {"ws": "http", "wss": "https"}.get(scheme, scheme)
+            base_url = urlunsplit((scheme, netloc, "/", "", ""))
+        self.base_url = base_url
+
+        if http_client is None:
+            http_client = _HTTPClient(force_instance=True, max_clients=max_concurrency)
+        self._http = http_client
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+        self.memory = LRUCache(memory_size, sizeof=len)
+        self.disk = None
+        if cache_dir is not None:
+            self.disk = DiskCache(os.path.expanduser(cache_dir), disk_size)
+
+        self._downloads = {}
+
+    def url(self, image_uri):
+        return urljoin(self.base_url, image_uri)
+
+    async def fetch(self, uri, width=None, height=None):
+        """
+        Return the bytes of the image for ``uri`` best matching the given
+        size, or :class:`None` if there is no image.
+        """
+        images = await self._client.loader.get_images(uri)
+        image = best_image(images, width, height)
+        if image is None:
+            return None
+        return await self.download(image.uri)
+
+    async def download(self, image_uri):
+        """Return the bytes of ``image_uri``, from cache when possible."""
+        data = self.memory.get(image_uri)
+        if data is not None:
+            return data
+
+        # Share a download already in progress for the same image
+        fut = self._downloads.get(image_uri)
+        if fut is None:
+            fut = asyncio.ensure_future(self._download(image_uri))
+            self._downloads[image_uri] = fut
+            fut.add_done_callback(lambda _: self._downloads.pop(image_uri, None))
+        return await asyncio.shield(fut)
+
+    async def _download(self, image_uri):
+        loop = asyncio.get_running_loop()
+        if self.disk is not None:
+            data = await loop.run_in_executor(None, self.disk.get, image_uri)
+            if data is not None:
+                self.memory.set(image_uri, data)
+                return data
+
+        async with self._semaphore:
+            _LOGGER.debug("Downloading image %s", image_uri)
+            response = await self._http.fetch(self.url(image_uri))
+        data = response.body
+
+        self.memory.set(image_uri, data)
+        if self.disk is not None:
+            await loop.run_in_executor(None, self.disk.set, image_uri, data)
+        return data
+
+    def close(self):
+        self._http.close()
@@ -0,0 +1,123 @@
+import asyncio
+import collections
+import logging
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class RttStats:
+
+    """
+    Round-trip times of keepalive pings, in seconds.
+
+    :param window: number of recent samples kept for percentiles
+    :param alpha: weight of a new sample in the moving average
+    """
+
+    def __init__(self, window=100, alpha=0.2):
+        self.alpha = alpha
+        self.count = 0
+        self.last = None
+        self.ewma = None
+        self._samples = collections.deque(maxlen=window)
+
+    def add(self, rtt):
+        self.count += 1
+        self.last = rtt
+        if self.ewma is None:
+            self.ewma = rtt
+        else:
+            self.ewma += self.alpha * (rtt - self.ewma)
+        self._samples.append(rtt)
+
+    def percentile(self, percent):
+        """Return the ``percent`` percentile of the recent samples."""
+        if not self._samples:
+            return None
+        samples = sorted(self._samples)
+        index = min(len(samples) - 1, int(round(percent / 100 * (len(samples) - 1))))
+        return samples[index]
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "last": self.last,
+            "ewma": self.ewma,
+            "min": min(self._samples) if self._samples else None,
+            "max": max(self._samples) if self._samples else None,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+        }
+
+
+class Keepalive:
+
+    """
+    Ping a transport periodically, measuring round-trip times and declaring
+    the connection dead after ``max_missed`` consecutive pings went
+    unanswered for ``timeout`` seconds.
+
+    Pongs are only seen while the connection is being read. While reading
+    is blocked, e.g. by a full event stream with the ``block`` overflow
+    policy, see :meth:`block`, unanswered pings are not counted as missed.
+
+    :param interval: seconds between pings
+    :param timeout: seconds to wait for a pong, defaults to ``interval``
+    :param max_missed: missed pongs before the connection is declared dead
+    """
+
+    def __init__(self, interval, timeout=None, max_missed=2):
+        self.interval = interval
+        self.timeout = interval if timeout is None else timeout
+        self.max_missed = max_missed
+        self.rtt = RttStats()
+        self.missed = 0
+        self._task = None
+        self._blocked = 0
+        self._was_blocked = False
+
+    def block(self):
+        """Suspend counting missed pongs until :meth:`unblock` is called."""
+        self._blocked += 1
+        self._was_blocked = True
+
+    def unblock(self):
+        self._blocked -= 1
+
+    def start(self, transport, on_dead):
+        self.stop()
+        self.missed = 0
+        self._task = asyncio.ensure_future(self._run(transport, on_dead))
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self, transport, on_dead):
+        while True:
+            await asyncio.sleep(self.interval)
+            start = time.monotonic()
+            self._was_blocked = self._blocked > 0
+            try:
+                await asyncio.wait_for(transport.ping(), self.timeout)
+            except asyncio.TimeoutError:
+                if self._was_blocked:
+                    _LOGGER.debug("No pong while reading is blocked")
+                    continue
+                self.missed += 1
+                _LOGGER.warning("Missed pong %d of %d", self.missed, self.max_missed)
+                if self.missed >= self.max_missed:
+                    self._task = None
+                    on_dead(transport)
+                    return
+                continue
+            except Exception:
+                _LOGGER.debug("Ping failed", exc_info=True)
+                continue
+            self.missed = 0
+            if not self._was_blocked:
+                # The pong may have waited for reading to resume
+                self.rtt.add(time.monotonic() - start)
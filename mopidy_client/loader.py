@@ -0,0 +1,138 @@
+import asyncio
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class BatchLoader:
+
+    """
+    Coalesce single key loads into batched calls.
+
+    Keys requested within ``window`` seconds of each other are collected and
+    resolved with one call to ``fetch``, which receives a list of keys and
+    must return a dict mapping keys to values. Results are stored in
+    ``cache`` and concurrent requests for a key already being fetched share
+    the same request.
+
+    :param fetch: coroutine function resolving a list of keys
+    :param cache: a :class:`~mopidy_client.cache.LRUCache` or :class:`None`
+    :param window: seconds to wait for more keys before fetching
+    :param max_batch: fetch immediately once this many keys are queued
+    :param default: value for keys missing from the ``fetch`` result
+    """
+
+    def __init__(self, fetch, cache=None, window=0.005, max_batch=100, default=()):
+        self._fetch = fetch
+        self.cache = cache
+        self.window = window
+        self.max_batch = max_batch
+        self.default = default
+
+        #: Number of ``fetch`` calls issued.
+        self.batches = 0
+        #: Number of keys requested through :meth:`load`.
+        self.requests = 0
+
+        self._queue = {}
+        self._in_flight = {}
+        self._timer = None
+
+    async def load(self, key):
+        self.requests += 1
+        if self.cache is not None:
+            value = self.cache.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+
+        fut = self._in_flight.get(key) or self._queue.get(key)
+        if fut is None:
+            fut = asyncio.get_running_loop().create_future()
+            self._queue[key] = fut
+            if len(self._queue) >= self.max_batch:
+                self.flush()
+            elif self._timer is None:
+                loop = asyncio.get_running_loop()
+                self._timer = loop.call_later(self.window, self.flush)
+
+        # Shield so one cancelled caller does not fail everyone waiting on key
+        return await asyncio.shield(fut)
+
+    async def load_many(self, keys):
+        keys = list(keys)
+        values = await asyncio.gather(*[self.load(key) for key in keys])
+        return dict(zip(keys, values))
+
+    def prime(self, key, value):
+        if self.cache is not None:
+            self.cache.set(key, value)
+
+    def flush(self):
+        """Fetch all queued keys now."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._queue:
+            return
+
+        batch, self._queue = self._queue, {}
+        self._in_flight.update(batch)
+        asyncio.ensure_future(self._dispatch(batch))
+
+    async def _dispatch(self, batch):
+        self.batches += 1
+        _LOGGER.debug("Loading batch of %d keys", len(batch))
+        try:
+            result = await self._fetch(list(batch))
+        except Exception as ex:
+            for key, fut in batch.items():
+                self._in_flight.pop(key, None)
+                if not fut.done():
+                    fut.set_exception(ex)
+            return
+
+        for key, fut in batch.items():
+            self._in_flight.pop(key, None)
+            value = result.get(key, self.default)
+            self.prime(key, value)
+            if not fut.done():
+                fut.set_result(value)
+
+
+class LibraryLoader:
+
+    """
+    Batching front end for ``core.library.lookup`` and
+    ``core.library.get_images`` sharing the client's
+    :class:`~mopidy_client.cache.LibraryCache`.
+
+    Usage::
+
+        tracks = await client.loader.lookup("local:track:foo.mp3")
+        images = await client.loader.get_images("local:album:bar")
+    """
+
+    def __init__(self, client, window=0.005, max_batch=100):
+        library = client.library
+        self.tracks = BatchLoader(
+            lambda uris: library.lookup(uris=uris),
+            client.cache.tracks,
+            window=window,
+            max_batch=max_batch,
+        )
+        self.images = BatchLoader(
+            lambda uris: library.get_images(uris=uris),
+            client.cache.images,
+            window=window,
+            max_batch=max_batch,
+        )
+
+    def lookup(self, uri):
+        """Return the list of :class:`~mopidy_client.models.Track` for uri."""
+        return self.tracks.load(uri)
+
+    def get_images(self, uri):
+        """Return the list of :class:`~mopidy_client.models.Image` for uri."""
+        return self.images.load(uri)
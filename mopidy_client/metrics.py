@@ -0,0 +1,287 @@
+import bisect
+import collections
+import json
+import time
+
+#: Default histogram buckets in seconds.
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class Histogram:
+
+    """
+    Cumulative histogram with fixed bucket boundaries, as used by
+    Prometheus.
+
+    :param buckets: sorted upper bounds of the buckets
+    """
+
+    __slots__ = ["buckets", "counts", "count", "sum"]
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        """Yield ``(upper bound, cumulative count)`` including ``+Inf``."""
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            yield bound, total
+
+
+def timed_loads(data, object_hook):
+    """
+    Decode the JSON ``data`` like :func:`json.loads`, timing the calls to
+    ``object_hook`` that construct models.
+
+    :rtype: tuple of the decoded message, total seconds, seconds spent
+        constructing models and number of models constructed
+    """
+    model_duration = 0.0
+    models = 0
+
+    def timed_hook(obj):
+        nonlocal model_duration, models
+        if "__model__" not in obj:
+            return object_hook(obj)
+        # Nested models are decoded first, so their time is never counted twice
+        start = time.perf_counter()
+        result = object_hook(obj)
+        model_duration += time.perf_counter() - start
+        models += 1
+        return result
+
+    start = time.perf_counter()
+    message = json.loads(data, object_hook=timed_hook)
+    return message, time.perf_counter() - start, model_duration, models
+
+
+class MetricsHook:
+
+    """
+    Receiver of client instrumentation callbacks.
+
+    Pass an instance as ``metrics`` to :class:`~mopidy_client.Client` and
+    override the callbacks of interest; the defaults do nothing. Without a
+    hook the client skips all measurements.
+    """
+
+    def request_sent(self, method, size):
+        """A request for ``method`` of ``size`` bytes was sent."""
+
+    def request_finished(self, method, duration, error=False):
+        """A request completed ``duration`` seconds after it was sent."""
+
+    def response_received(self, method, size):
+        """A response of ``size`` bytes to a ``method`` request arrived."""
+
+    def message_decoded(self, size, duration, model_duration, models):
+        """
+        A message of ``size`` bytes was decoded in ``duration`` seconds, of
+        which ``model_duration`` were spent constructing ``models`` models.
+        """
+
+    def event_dispatched(self, event, listeners):
+        """``event`` was queued for ``listeners`` listeners and streams."""
+
+    def handler_finished(self, event, duration, error=False):
+        """An ``event`` handler returned after ``duration`` seconds."""
+
+
+class ClientMetrics(MetricsHook):
+
+    """
+    :class:`MetricsHook` keeping counters and histograms in memory, which
+    can be exported with :meth:`prometheus`.
+
+    :param buckets: histogram buckets in seconds
+    :param prefix: prefix of the exported metric names
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, prefix="mopidy_client"):
+        self.buckets = buckets
+        self.prefix = prefix
+
+        self.request_duration = collections.defaultdict(self._histogram)
+        self.requests_in_flight = collections.Counter()
+        self.request_errors = collections.Counter()
+        self.request_bytes = collections.Counter()
+        self.response_bytes = collections.Counter()
+
+        self.decode_duration = self._histogram()
+        self.decoded_bytes = 0
+        self.model_duration = 0.0
+        self.models = 0
+
+        self.events = collections.Counter()
+        self.handler_duration = collections.defaultdict(self._histogram)
+        self.handler_errors = collections.Counter()
+
+    def _histogram(self):
+        return Histogram(self.buckets)
+
+    def request_sent(self, method, size):
+        self.requests_in_flight[method] += 1
+        self.request_bytes[method] += size
+
+    def request_finished(self, method, duration, error=False):
+        self.requests_in_flight[method] -= 1
+        self.request_duration[method].observe(duration)
+        if error:
+            self.request_errors[method] += 1
+
+    def response_received(self, method, size):
+        self.response_bytes[method] += size
+
+    def message_decoded(self, size, duration, model_duration, models):
+        self.decode_duration.observe(duration)
+        self.decoded_bytes += size
+        self.model_duration += model_duration
+        self.models += models
+
+    def event_dispatched(self, event, listeners):
+        self.events[event] += 1
+
+    def handler_finished(self, event, duration, error=False):
+        self.handler_duration[event].observe(duration)
+        if error:
+            self.handler_errors[event] += 1
+
+    def prometheus(self):
+        """Return all metrics in the Prometheus text exposition format."""
+        return prometheus_text(self)
+
+
+def _labels(**labels):
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels.items():
+        value = (
+            str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_bound(bound):
+    return "+Inf" if bound == float("inf") else repr(bound)
+
+
+def _histogram_lines(name, histogram, **labels):
+    for bound, count in histogram.cumulative():
+        yield f"{name}_bucket{_labels(**labels, le=_format_bound(bound))} {count}"
+    yield f"{name}_sum{_labels(**labels)} {histogram.sum!r}"
+    yield f"{name}_count{_labels(**labels)} {histogram.count}"
+
+
+def prometheus_text(metrics):
+    """Render a :class:`ClientMetrics` in the Prometheus text format."""
+    p = metrics.prefix
+    lines = []
+
+    def header(name, kind, text):
+        lines.append(f"# HELP {name} {text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    name = f"{p}_request_duration_seconds"
+    header(name, "histogram", "Time from sending a request to its response.")
+    for method, histogram in sorted(metrics.request_duration.items()):
+        lines.extend(_histogram_lines(name, histogram, method=method))
+
+    for name, kind, text, values in (
+        (
+            f"{p}_requests_in_flight",
+            "gauge",
+            "Requests awaiting a response.",
+            metrics.requests_in_flight,
+        ),
+        (
+            f"{p}_request_errors_total",
+            "counter",
+            "Requests answered with an error.",
+            metrics.request_errors,
+        ),
+        (
+            f"{p}_request_bytes_total",
+            "counter",
+            "Bytes of requests sent.",
+            metrics.request_bytes,
+        ),
+        (
+            f"{p}_response_bytes_total",
+            "counter",
+            "Bytes of responses received.",
+            metrics.response_bytes,
+        ),
+    ):
+        header(name, kind, text)
+        for method, value in sorted(values.items()):
+            lines.append(f"{name}{_labels(method=method)} {value}")
+
+    name = f"{p}_decode_duration_seconds"
+    header(name, "histogram", "Time spent decoding incoming messages.")
+    lines.extend(_histogram_lines(name, metrics.decode_duration))
+
+    for name, kind, text, value in (
+        (
+            f"{p}_decoded_bytes_total",
+            "counter",
+            "Bytes of incoming messages decoded.",
+            metrics.decoded_bytes,
+        ),
+        (
+            f"{p}_model_construction_seconds_total",
+            "counter",
+            "Time spent constructing models while decoding.",
+            metrics.model_duration,
+        ),
+        (
+            f"{p}_models_total",
+            "counter",
+            "Models constructed while decoding.",
+            metrics.models,
+        ),
+    ):
+        header(name, kind, text)
+        lines.append(f"{name} {value!r}")
+
+    name = f"{p}_events_total"
+    header(name, "counter", "Events received from the server.")
+    for event, value in sorted(metrics.events.items()):
+        lines.append(f"{name}{_labels(event=event)} {value}")
+
+    name = f"{p}_handler_duration_seconds"
+    header(name, "histogram", "Time spent in event handlers.")
+    for event, histogram in sorted(metrics.handler_duration.items()):
+        lines.extend(_histogram_lines(name, histogram, event=event))
+
+    name = f"{p}_handler_errors_total"
+    header(name, "counter", "Event handlers that raised an exception.")
+    for event, value in sorted(metrics.handler_errors.items()):
+        lines.append(f"{name}{_labels(event=event)} {value}")
+
+    return "\n".join(lines) + "\n"
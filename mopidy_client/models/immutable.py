@@ -7,6 +7,20 @@ from .fields import Field
 # Registered models for automatic deserialization
 _models = {}
 
+# Memo hit and miss counters by model name, None unless enabled in models.stats
+_memo_stats = None
+_MEMO_KEYS = ("init_hits", "init_misses", "replace_hits", "replace_misses")
+
+
+def _memoize(cls, instance, kind):
+    memoized = cls._instances.setdefault(weakref.ref(instance), instance)
+    if _memo_stats is not None:
+        counts = _memo_stats.get(cls.__name__)
+        if counts is None:
+            counts = _memo_stats[cls.__name__] = dict.fromkeys(_MEMO_KEYS, 0)
+        counts[f"{kind}_hits" if memoized is not instance else f"{kind}_misses"] += 1
+    return memoized
+
 
 class ImmutableObject:
     """
@@ -157,7 +171,7 @@ class _ValidatedImmutableObjectMeta(type):
 
     def __call__(cls, *args, **kwargs):  # noqa: N805
         instance = super().__call__(*args, **kwargs)
-        return cls._instances.setdefault(weakref.ref(instance), instance)
+        return _memoize(cls, instance, "init")
 
 
 class ValidatedImmutableObject(
@@ -216,4 +230,4 @@ class ValidatedImmutableObject(
         other = super().replace(**kwargs)
         if hasattr(self, "_hash"):
             object.__delattr__(other, "_hash")
-        return self._instances.setdefault(weakref.ref(other), other)
+        return _memoize(self.__class__, other, "replace")
@@ -0,0 +1,203 @@
+"""
+Introspection of the memory used by models.
+
+:class:`~mopidy_client.models.ValidatedImmutableObject` memoizes instances
+and :class:`~mopidy_client.models.fields.Identifier` interns its values;
+the functions here show how well that works for the data actually loaded.
+"""
+
+import sys
+import tracemalloc
+
+from . import fields, immutable
+
+
+def enable_memo_stats():
+    """Start counting memo hits and misses of construction and ``replace``."""
+    if immutable._memo_stats is None:
+        immutable._memo_stats = {}
+
+
+def disable_memo_stats():
+    """Stop counting memo hits and misses and drop the counters."""
+    immutable._memo_stats = None
+
+
+def reset_memo_stats():
+    if immutable._memo_stats is not None:
+        immutable._memo_stats.clear()
+
+
+def memo_stats():
+    """
+    Return the memo counters per model name, empty unless enabled with
+    :func:`enable_memo_stats`.
+
+    :rtype: dict mapping model name to a dict of ``init_hits``,
+        ``init_misses``, ``replace_hits`` and ``replace_misses``
+    """
+    return {
+        name: dict(counts) for name, counts in (immutable._memo_stats or {}).items()
+    }
+
+
+def _hit_rate(hits, misses):
+    total = hits + misses
+    return hits / total if total else None
+
+
+def _field_kinds(cls):
+    interned, strings = [], []
+    for name, slot in cls._fields.items():
+        field = getattr(cls, name)
+        if isinstance(field, fields.Identifier):
+            interned.append(slot)
+        elif isinstance(field, fields.String):
+            strings.append(slot)
+    return interned, strings
+
+
+def _class_stats(cls, seen):
+    interned_slots, string_slots = _field_kinds(cls)
+    instances = list(cls._instances.values())
+    stats = {
+        "instances": len(instances),
+        "instance_bytes": 0,
+        "value_bytes": 0,
+        "interned": 0,
+        "interned_refs": 0,
+        "interned_saved_bytes": 0,
+        "strings": 0,
+        "duplicate_string_bytes": 0,
+    }
+    interned = set()
+    strings = {}
+
+    for instance in instances:
+        stats["instance_bytes"] += sys.getsizeof(instance)
+        for slot in cls._fields.values():
+            value = getattr(instance, slot, None)
+            if value is None or isinstance(value, immutable.ImmutableObject):
+                continue
+            if id(value) not in seen:
+                seen.add(id(value))
+                stats["value_bytes"] += sys.getsizeof(value)
+            if slot in interned_slots:
+                stats["interned_refs"] += 1
+                if id(value) in interned:
+                    stats["interned_saved_bytes"] += sys.getsizeof(value)
+                else:
+                    interned.add(id(value))
+            elif slot in string_slots:
+                stats["strings"] += 1
+                copies = strings.setdefault(value, set())
+                if copies and id(value) not in copies:
+                    stats["duplicate_string_bytes"] += sys.getsizeof(value)
+                copies.add(id(value))
+
+    stats["interned"] = len(interned)
+    stats["retained_bytes"] = stats["instance_bytes"] + stats["value_bytes"]
+    return stats
+
+
+def model_stats():
+    """
+    Return memory statistics of the live instances of every model.
+
+    Sizes come from :func:`sys.getsizeof` and are approximate. Strings and
+    collections shared between instances are counted once, for the first
+    model found referencing them; nested models count towards their own
+    class.
+
+    Per model name the dict contains:
+
+    - ``instances``: live memoized instances
+    - ``instance_bytes``: size of the instances themselves
+    - ``value_bytes``: size of the strings and collections they hold
+    - ``retained_bytes``: sum of the two above
+    - ``interned`` and ``interned_refs``: distinct identifier strings and
+      references to them, ``interned_saved_bytes`` what separate copies
+      would have cost
+    - ``strings``: references to plain string values and
+      ``duplicate_string_bytes`` taken by equal but separate copies, which
+      interning would save
+    - the :func:`memo_stats` counters with ``init_hit_rate`` and
+      ``replace_hit_rate``, when enabled
+
+    :rtype: dict mapping model name to a dict of statistics
+    """
+    memo = memo_stats()
+    seen = set()
+    result = {}
+    for name, cls in sorted(immutable._models.items()):
+        stats = _class_stats(cls, seen)
+        counts = memo.get(name)
+        if counts is not None:
+            stats.update(counts)
+            stats["init_hit_rate"] = _hit_rate(
+                counts["init_hits"], counts["init_misses"]
+            )
+            stats["replace_hit_rate"] = _hit_rate(
+                counts["replace_hits"], counts["replace_misses"]
+            )
+        result[name] = stats
+    return result
+
+
+class MemoryDiff:
+
+    """
+    Context manager measuring allocations made inside it with
+    :mod:`tracemalloc`.
+
+    Usage::
+
+        with MemoryDiff() as diff:
+            tracks = await client.library.lookup(uris=uris)
+        print(diff.total)
+        for stat in diff.top(10):
+            print(stat)
+
+    Tracing is started when needed and stopped again on exit if it was.
+
+    :param key_type: how allocations are grouped, ``"lineno"``,
+        ``"filename"`` or ``"traceback"``
+    :param frames: number of frames stored per allocation
+    """
+
+    def __init__(self, key_type="lineno", frames=1):
+        self.key_type = key_type
+        self.frames = frames
+        self.before = None
+        self.after = None
+        self._started = False
+
+    def __enter__(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started = True
+        self.before = tracemalloc.take_snapshot()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.after = tracemalloc.take_snapshot()
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+
+    def _filtered(self, snapshot):
+        return snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+
+    def statistics(self):
+        """:rtype: list of :class:`tracemalloc.StatisticDiff`, largest first"""
+        return self._filtered(self.after).compare_to(
+            self._filtered(self.before), self.key_type
+        )
+
+    def top(self, limit=10):
+        return self.statistics()[:limit]
+
+    @property
+    def total(self):
+        """Net bytes allocated inside the block."""
+        return sum(stat.size_diff for stat in self.statistics())
@@ -0,0 +1,131 @@
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class PlaylistSync:
+
+    """
+    Keep a local index of full :class:`~mopidy_client.models.Playlist`
+    models in sync with the server using as few calls as possible.
+
+    ``playlist_changed`` and ``playlist_deleted`` event payloads are applied
+    to the index directly. ``playlists_loaded``, sent after a backend
+    reloaded its playlists, is not followed by per playlist events, so it
+    triggers a :meth:`refresh`.
+
+    ``as_list`` only returns :class:`~mopidy_client.models.Ref` models, which
+    carry no ``last_modified``, so a playlist changed without an event can
+    only be detected by looking it up. :meth:`refresh` with ``full=True``
+    does this, pipelining the lookups and only replacing playlists whose
+    ``last_modified`` changed. Without it only playlists that appeared or
+    were renamed are fetched and vanished ones dropped.
+
+    :param client: a connected :class:`~mopidy_client.Client`
+    :param window: maximum number of lookups in flight
+    :param on_change: optional callable receiving each changed playlist
+    :param on_delete: optional callable receiving each deleted URI
+    :param full_reload: look up every playlist on ``playlists_loaded``;
+        when false, playlists edited while keeping their name stay stale
+        until their next ``playlist_changed``
+    """
+
+    def __init__(
+        self, client, window=4, on_change=None, on_delete=None, full_reload=True
+    ):
+        self._client = client
+        self.window = window
+        self.full_reload = full_reload
+        self.on_change = on_change
+        self.on_delete = on_delete
+
+        #: Maps playlist URI to the latest known full playlist.
+        self.playlists = {}
+
+        self._names = {}
+        self._unsubs = []
+
+    async def start(self):
+        self._unsubs = [
+            self._client.on_playlist_changed(self._on_playlist_changed),
+            self._client.on_playlist_deleted(self._on_playlist_deleted),
+            self._client.on_playlists_loaded(self._on_playlists_loaded, coalesce=True),
+        ]
+        await self.refresh()
+
+    def stop(self):
+        for unsub in self._unsubs:
+            unsub()
+        self._unsubs = []
+
+    def _update(self, playlist):
+        current = self.playlists.get(playlist.uri)
+        if (
+            current is not None
+            and playlist.last_modified is not None
+            and current.last_modified is not None
+            # A lookup result can be older than an event applied meanwhile
+            and current.last_modified >= playlist.last_modified
+        ):
+            return False
+
+        self.playlists[playlist.uri] = playlist
+        self._names[playlist.uri] = playlist.name
+        if self.on_change is not None:
+            self.on_change(playlist)
+        return True
+
+    def _remove(self, uri):
+        self._names.pop(uri, None)
+        if self.playlists.pop(uri, None) is not None:
+            if self.on_delete is not None:
+                self.on_delete(uri)
+            return True
+        return False
+
+    async def refresh(self, full=False):
+        """
+        Bring the index up to date.
+
+        :param full: also look up playlists that appear unchanged
+        :rtype: tuple of the changed and the removed playlist URIs
+        """
+        refs = await self._client.playlists.as_list()
+        names = {ref.uri: ref.name for ref in refs}
+
+        removed = [uri for uri in self.playlists if uri not in names]
+        for uri in removed:
+            self._remove(uri)
+
+        if full:
+            stale = list(names)
+        else:
+            stale = [
+                uri
+                for uri, name in names.items()
+                if uri not in self.playlists or self._names.get(uri) != name
+            ]
+
+        changed = []
+        if stale:
+            _LOGGER.debug("Looking up %d of %d playlists", len(stale), len(names))
+            playlists = await self._client.playlists.bulk_lookup(
+                stale, window=self.window
+            )
+            for uri, playlist in zip(stale, playlists):
+                if playlist is None:
+                    if self._remove(uri):
+                        removed.append(uri)
+                elif self._update(playlist):
+                    changed.append(uri)
+
+        return changed, removed
+
+    def _on_playlist_changed(self, playlist):
+        self._update(playlist)
+
+    def _on_playlist_deleted(self, uri):
+        self._remove(uri)
+
+    async def _on_playlists_loaded(self):
+        await self.refresh(full=self.full_reload)
@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+PLAYING = "playing"
+PAUSED = "paused"
+STOPPED = "stopped"
+
+
+class PositionEstimator:
+
+    """
+    Estimate the current playback position without polling the server.
+
+    The estimator anchors on playback events and on an occasional resync
+    with ``core.playback.get_time_position``, and extrapolates the position
+    from the monotonic clock in between. Drift is bounded by resyncing every
+    ``resync_interval`` seconds while playing.
+
+    Usage::
+
+        estimator = PositionEstimator(client)
+        await estimator.start()
+        ...
+        print(estimator.position)
+
+    :param client: a connected :class:`~mopidy_client.Client`
+    :param resync_interval: seconds between resyncs while playing,
+        :class:`None` to only resync on demand
+    """
+
+    def __init__(self, client, resync_interval=30.0):
+        self._client = client
+        self.resync_interval = resync_interval
+
+        self.state = STOPPED
+        self.tl_track = None
+
+        #: Difference in milliseconds between the estimate and the server
+        #: position at the last resync.
+        self.last_drift = None
+
+        self._anchor_position = 0
+        self._anchor_time = time.monotonic()
+        self._unsubs = []
+        self._resync_task = None
+
+    @property
+    def position(self):
+        """The estimated time position in milliseconds."""
+        position = self._anchor_position
+        if self.state == PLAYING:
+            position += int((time.monotonic() - self._anchor_time) * 1000)
+
+        length = self.length
+        if length is not None and position > length:
+            position = length
+        return position
+
+    @property
+    def length(self):
+        """Length of the current track in milliseconds, if known."""
+        if self.tl_track is None or self.tl_track.track is None:
+            return None
+        return self.tl_track.track.length
+
+    def _anchor(self, position, at=None):
+        self._anchor_position = position or 0
+        self._anchor_time = time.monotonic() if at is None else at
+
+    async def start(self):
+        client = self._client
+        self._unsubs = [
+            client.on_track_playback_started(self._on_started),
+            client.on_track_playback_paused(self._on_paused),
+            client.on_track_playback_resumed(self._on_resumed),
+            client.on_track_playback_ended(self._on_ended),
+            client.on_seeked(self._on_seeked),
+            client.on_playback_state_changed(self._on_state_changed),
+        ]
+        await self.resync()
+        if self.resync_interval is not None:
+            self._resync_task = asyncio.ensure_future(self._resync_loop())
+
+    def stop(self):
+        for unsub in self._unsubs:
+            unsub()
+        self._unsubs = []
+        if self._resync_task is not None:
+            self._resync_task.cancel()
+            self._resync_task = None
+
+    async def resync(self):
+        """Re-anchor on the server's state and time position."""
+        playback = self._client.playback
+        start = time.monotonic()
+        state, position, tl_track = await asyncio.gather(
+            playback.get_state(),
+            playback.get_time_position(),
+            playback.get_current_tl_track(),
+        )
+        end = time.monotonic()
+
+        if self.state == PLAYING and state == PLAYING:
+            self.last_drift = self.position - position
+            _LOGGER.debug("Position drift %dms", self.last_drift)
+
+        self.state = state
+        self.tl_track = tl_track
+        # Assume the position was sampled halfway through the round-trip
+        self._anchor(position, at=(start + end) / 2)
+
+    async def _resync_loop(self):
+        while True:
+            await asyncio.sleep(self.resync_interval)
+            if self.state != PLAYING:
+                continue
+            try:
+                await self.resync()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                _LOGGER.exception("Failed resyncing playback position")
+
+    def _on_started(self, tl_track):
+        self.state = PLAYING
+        self.tl_track = tl_track
+        self._anchor(0)
+
+    def _on_paused(self, tl_track, time_position):
+        self.state = PAUSED
+        self.tl_track = tl_track
+        self._anchor(time_position)
+
+    def _on_resumed(self, tl_track, time_position):
+        self.state = PLAYING
+        self.tl_track = tl_track
+        self._anchor(time_position)
+
+    def _on_ended(self, tl_track, time_position):
+        self.state = STOPPED
+        self._anchor(time_position)
+
+    def _on_seeked(self, time_position):
+        self._anchor(time_position)
+
+    def _on_state_changed(self, old_state, new_state):
+        # Freeze the estimate at the moment of the transition
+        self._anchor(self.position)
+        self.state = new_state
+        if new_state == STOPPED:
+            self.tl_track = None
+            self._anchor(0)
@@ -0,0 +1,94 @@
+import asyncio
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class Prefetcher:
+
+    """
+    Warm the client's :class:`~mopidy_client.cache.LibraryCache` with the
+    upcoming tracks of the tracklist.
+
+    When a track starts playing the prefetcher waits ``delay`` seconds, so it
+    does not compete with the requests the UI sends right away, then resolves
+    the next ``depth`` tracklist entries and fetches their ``lookup`` and
+    ``get_images`` results for any URI not already cached.
+
+    :param client: a connected :class:`~mopidy_client.Client`
+    :param depth: number of upcoming tracks to prefetch
+    :param delay: seconds to wait after a playback event before prefetching
+    :param images: also prefetch ``core.library.get_images``
+    """
+
+    def __init__(self, client, depth=1, delay=0.5, images=True):
+        self._client = client
+        self.depth = depth
+        self.delay = delay
+        self.images = images
+        self._unsubs = []
+        self._task = None
+
+    def start(self):
+        self._unsubs = [
+            self._client.on_track_playback_started(self._schedule, coalesce=True),
+            self._client.on_tracklist_changed(self._schedule, coalesce=True),
+        ]
+
+    def stop(self):
+        for unsub in self._unsubs:
+            unsub()
+        self._unsubs = []
+        self._cancel()
+
+    def _cancel(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _schedule(self, **kwargs):
+        # A newer event supersedes any prefetch still waiting
+        self._cancel()
+        self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self):
+        await asyncio.sleep(self.delay)
+        try:
+            await self.prefetch()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            _LOGGER.exception("Prefetching upcoming tracks failed")
+
+    async def upcoming(self):
+        """Return the next ``depth`` :class:`~mopidy_client.models.TlTrack`."""
+        tracklist = self._client.tracklist
+        tlid = await tracklist.get_next_tlid()
+        if tlid is None:
+            return []
+        if self.depth == 1:
+            return await tracklist.filter(criteria={"tlid": [tlid]})
+        index = await tracklist.index(tlid=tlid)
+        return await tracklist.slice(start=index, end=index + self.depth)
+
+    async def prefetch(self):
+        cache = self._client.cache
+        library = self._client.library
+
+        uris = []
+        for tl_track in await self.upcoming():
+            if tl_track.track.uri not in uris:
+                uris.append(tl_track.track.uri)
+
+        missing = [uri for uri in uris if uri not in cache.tracks]
+        if missing:
+            _LOGGER.debug("Prefetching tracks %s", missing)
+            for uri, tracks in (await library.lookup(uris=missing)).items():
+                cache.tracks.set(uri, tracks)
+
+        if self.images:
+            missing = [uri for uri in uris if uri not in cache.images]
+            if missing:
+                _LOGGER.debug("Prefetching images %s", missing)
+                for uri, images in (await library.get_images(uris=missing)).items():
+                    cache.images.set(uri, images)
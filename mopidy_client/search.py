@@ -0,0 +1,123 @@
+import asyncio
+import logging
+
+from mopidy_client import models
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def search_stream(library, query, uris=None, exact=False):
+    """
+    Search every URI scheme concurrently and yield each
+    :class:`~mopidy_client.models.SearchResult` as soon as it arrives.
+
+    Without ``uris`` one search is issued per URI scheme reported by
+    ``core.get_uri_schemes``, otherwise one per URI. Mopidy doesn't tell
+    which schemes belong to the same backend, so a backend handling several
+    schemes is searched once for each. A failing search is logged and
+    skipped rather than failing the whole search.
+
+    :param library: a :class:`~mopidy_client.core.LibraryController`
+    :param query: the search query, as for ``core.library.search``
+    :param uris: optional list of URIs to scope the search to
+    :param exact: only yield exact matches
+    """
+    if uris is None:
+        schemes = await library._client.core.get_uri_schemes()
+        uris = [f"{scheme}:" for scheme in schemes]
+
+    async def search(uri):
+        try:
+            return await library.search(query=query, uris=[uri], exact=exact)
+        except Exception:
+            _LOGGER.exception("Searching %s failed", uri)
+            return []
+
+    tasks = [asyncio.ensure_future(search(uri)) for uri in uris]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            for result in await next_done:
+                if result is not None:
+                    yield result
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def _match_score(text, terms):
+    if not text:
+        return 0
+    text = text.lower()
+    score = 0
+    for term in terms:
+        if text == term:
+            score += 3
+        elif text.startswith(term):
+            score += 2
+        elif term in text:
+            score += 1
+    return score
+
+
+class SearchMerger:
+
+    """
+    Merge :class:`~mopidy_client.models.SearchResult` from several backends
+    into one deduplicated and ranked result.
+
+    Tracks, albums and artists are deduplicated on their URI. They are
+    ranked by how well their name matches the query terms, then by arrival
+    order. How many results an item appeared in is not taken into account,
+    as a backend searched for several of its URI schemes returns the same
+    items repeatedly.
+
+    :param query: the search query the results are for
+    """
+
+    def __init__(self, query=None):
+        self.terms = []
+        for values in (query or {}).values():
+            if isinstance(values, str):
+                values = [values]
+            self.terms.extend(str(value).lower() for value in values)
+
+        self.results = 0
+        self._tracks = {}
+        self._artists = {}
+        self._albums = {}
+
+    def add(self, result):
+        self.results += 1
+        for items, seen in (
+            (result.tracks, self._tracks),
+            (result.artists, self._artists),
+            (result.albums, self._albums),
+        ):
+            for item in items:
+                if item.uri not in seen:
+                    seen[item.uri] = (item, len(seen))
+
+    def _ranked(self, seen):
+        entries = sorted(
+            seen.values(),
+            key=lambda entry: (-_match_score(entry[0].name, self.terms), entry[1]),
+        )
+        return [entry[0] for entry in entries]
+
+    @property
+    def tracks(self):
+        return self._ranked(self._tracks)
+
+    @property
+    def artists(self):
+        return self._ranked(self._artists)
+
+    @property
+    def albums(self):
+        return self._ranked(self._albums)
+
+    def result(self):
+        """Return the merged :class:`~mopidy_client.models.SearchResult`."""
+        return models.SearchResult(
+            tracks=self.tracks, artists=self.artists, albums=self.albums
+        )
@@ -0,0 +1,277 @@
+import asyncio
+import inspect
+import json
+import logging
+import random
+import traceback
+
+from tornado import httpserver, netutil, web, websocket
+
+from mopidy_client import models
+from mopidy_client.transport.loopback import LoopbackTransport
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class FakeMopidy:
+
+    """
+    In-process stand-in for Mopidy's JSON-RPC API.
+
+    Methods are registered by their full JSON-RPC name, either as a callable
+    receiving the request params as keyword arguments, or as a constant
+    result. ``core.describe`` is generated from the registered methods.
+
+    Usage::
+
+        server = FakeMopidy({"core.playback.get_state": "playing"})
+        client = Client("loopback://", transport=server.transport)
+        await client.connect()
+        server.emit("volume_changed", volume=50)
+
+    :param methods: optional dict of method name to handler or result
+    """
+
+    def __init__(self, methods=None, version="3.4.2"):
+        self.methods = {
+            "core.describe": self.describe,
+            "core.get_version": version,
+        }
+        self.methods.update(methods or {})
+        self.connections = set()
+
+        #: Number of requests handled.
+        self.requests = 0
+
+    def register(self, method, handler):
+        self.methods[method] = handler
+
+    def load(self, path):
+        """
+        Register the recorded results in the JSON file ``path``, as written
+        by :func:`record`, as constant results.
+        """
+        with open(path) as fh:
+            recorded = json.load(fh, object_hook=models.model_json_decoder)
+        self.methods.update(recorded)
+
+    def transport(self):
+        """Create a :class:`LoopbackTransport` connected to this server."""
+        return LoopbackTransport(self)
+
+    def describe(self):
+        description = {}
+        for name, handler in self.methods.items():
+            params = []
+            if callable(handler):
+                for param in inspect.signature(handler).parameters.values():
+                    if param.kind == param.VAR_KEYWORD:
+                        params.append({"name": param.name, "kwargs": True})
+                    elif param.kind == param.VAR_POSITIONAL:
+                        params.append({"name": param.name, "varargs": True})
+                    elif param.default is not param.empty:
+                        params.append({"name": param.name, "default": param.default})
+                    else:
+                        params.append({"name": param.name})
+            description[name] = {"description": None, "params": params}
+        return description
+
+    def attach(self, connection):
+        self.connections.add(connection)
+
+    def detach(self, connection):
+        self.connections.discard(connection)
+
+    def receive(self, connection, message):
+        response = self.handle(message)
+        if response is not None:
+            connection.deliver(response)
+
+    def _error(self, request_id, code, message, data=None):
+        # Like Mopidy, protocol errors carry a string or no data and only
+        # failed calls a dict with the traceback
+        error = {"code": code, "message": message}
+        if data is not None:
+            error["data"] = data
+        return {"jsonrpc": "2.0", "id": request_id, "error": error}
+
+    def _exc_data(self, exc):
+        return {
+            "type": exc.__class__.__name__,
+            "message": str(exc),
+            "traceback": traceback.format_exc(),
+        }
+
+    def handle(self, message):
+        """Handle one JSON-RPC request and return the encoded response."""
+        self.requests += 1
+        try:
+            request = json.loads(message, object_hook=models.model_json_decoder)
+        except ValueError:
+            return json.dumps(self._error(None, -32700, "Parse error"))
+        request_id = request.get("id")
+        method = request.get("method")
+
+        if method not in self.methods:
+            mount, _, name = str(method).rpartition(".")
+            response = self._error(
+                request_id,
+                -32601,
+                "Method not found",
+                f'Object mounted at "{mount}" has no member "{name}"',
+            )
+        else:
+            handler = self.methods[method]
+            try:
+                if callable(handler):
+                    result = handler(**request.get("params", {}))
+                else:
+                    result = handler
+                response = {"jsonrpc": "2.0", "id": request_id, "result": result}
+            except TypeError as ex:
+                _LOGGER.debug("Fake %s failed", method, exc_info=True)
+                response = self._error(
+                    request_id, -32602, "Invalid params", self._exc_data(ex)
+                )
+            except Exception as ex:
+                _LOGGER.debug("Fake %s failed", method, exc_info=True)
+                response = self._error(
+                    request_id, 0, "Application error", self._exc_data(ex)
+                )
+
+        if request_id is None:
+            return None
+        return json.dumps(response, cls=models.ModelJSONEncoder)
+
+    def emit(self, event, **data):
+        """Send ``event`` with ``data`` to every connected client."""
+        data["event"] = event
+        message = json.dumps(data, cls=models.ModelJSONEncoder)
+        for connection in list(self.connections):
+            connection.deliver(message)
+
+
+async def record(client, calls, path):
+    """
+    Record the results of ``calls`` on a real server to the JSON file
+    ``path``, for :meth:`FakeMopidy.load` to replay.
+
+    :param calls: dict of method name to dict of params
+    """
+    recorded = {}
+    for method, params in calls.items():
+        recorded[method] = await client.call(method, **params)
+    with open(path, "w") as fh:
+        json.dump(recorded, fh, cls=models.ModelJSONEncoder)
+    return recorded
+
+
+class _FakeMopidyHandler(websocket.WebSocketHandler):
+    def initialize(self, server):
+        self.server = server
+
+    def get_compression_options(self):
+        return self.server.compression
+
+    def open(self):
+        self.server.fake.attach(self)
+
+    def on_close(self):
+        self.server.fake.detach(self)
+
+    def on_message(self, message):
+        self.server.receive(self, message)
+
+    def deliver(self, data):
+        try:
+            self.write_message(data)
+        except websocket.WebSocketClosedError:
+            pass
+
+
+class FakeMopidyServer:
+
+    """
+    Serve a :class:`FakeMopidy` over websockets with tornado, so clients can
+    be exercised over real sockets without a Mopidy server.
+
+    Usage::
+
+        server = FakeMopidyServer(FakeMopidy(), latency=0.002)
+        await server.start()
+        client = Client(server.url)
+        await client.connect()
+
+    :param fake: the :class:`FakeMopidy` answering requests, a new one by
+        default
+    :param latency: seconds added before every response
+    :param jitter: up to this many seconds added randomly on top of
+        ``latency``
+    :param compression: tornado compression options, :class:`None` disables
+        permessage-deflate
+    :param path: websocket path
+    """
+
+    def __init__(
+        self, fake=None, latency=0.0, jitter=0.0, compression=None, path="/mopidy/ws"
+    ):
+        self.fake = FakeMopidy() if fake is None else fake
+        self.latency = latency
+        self.jitter = jitter
+        self.compression = compression
+        self.path = path
+        self.port = None
+        self._server = None
+
+    @property
+    def url(self):
+        return f"ws://127.0.0.1:{self.port}{self.path}"
+
+    async def start(self, port=0, address="127.0.0.1"):
+        """Start listening, on a free port unless ``port`` is given."""
+        app = web.Application([(self.path, _FakeMopidyHandler, {"server": self})])
+        sockets = netutil.bind_sockets(port, address)
+        self.port = sockets[0].getsockname()[1]
+        self._server = httpserver.HTTPServer(app)
+        self._server.add_sockets(sockets)
+
+    def stop(self):
+        if self._server is not None:
+            self._server.stop()
+            self._server = None
+        for connection in list(self.fake.connections):
+            connection.close()
+
+    def receive(self, connection, message):
+        delay = self.latency
+        if self.jitter:
+            delay += random.uniform(0, self.jitter)
+        if delay > 0:
+            loop = asyncio.get_running_loop()
+            loop.call_later(delay, self.fake.receive, connection, message)
+        else:
+            self.fake.receive(connection, message)
+
+    async def event_storm(self, event, count, rate=None, **data):
+        """
+        Emit ``event`` ``count`` times to every client.
+
+        Callable values in ``data`` are called for every event, e.g.
+        ``sent=time.perf_counter`` to stamp each one.
+
+        :param rate: events per second, as fast as possible by default
+        """
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for i in range(count):
+            self.fake.emit(
+                event,
+                **{key: v() if callable(v) else v for key, v in data.items()},
+            )
+            if rate:
+                delay = start + (i + 1) / rate - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            elif i % 100 == 99:
+                # Let the connections flush their buffers
+                await asyncio.sleep(0)
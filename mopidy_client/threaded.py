@@ -0,0 +1,281 @@
+import asyncio
+import concurrent.futures
+import inspect
+import logging
+import threading
+from functools import partial
+
+from .client import Client
+from .dispatch import DROP_OLDEST
+
+_LOGGER = logging.getLogger(__name__)
+
+_CONTROLLERS = (
+    "core",
+    "history",
+    "library",
+    "mixer",
+    "playback",
+    "playlists",
+    "tracklist",
+)
+
+
+class ControllerProxy:
+
+    """
+    Thread side stand-in for a controller of the wrapped client; every
+    method call is run on the client's event loop and returns a
+    :class:`concurrent.futures.Future`.
+    """
+
+    def __init__(self, threaded, name):
+        self._threaded = threaded
+        self._name = name
+
+    def __getattr__(self, method_name):
+        if method_name.startswith("_"):
+            raise AttributeError(method_name)
+
+        def meth(*args, **kwargs):
+            controller = getattr(self._threaded.client, self._name)
+            # Resolve the method on the loop, controllers create them lazily
+            return self._threaded.submit(
+                lambda: getattr(controller, method_name)(*args, **kwargs)
+            )
+
+        meth.__name__ = method_name
+        return meth
+
+
+class ThreadedEventStream:
+
+    """
+    Blocking iterator over an :class:`~mopidy_client.dispatch.EventStream`
+    of the wrapped client, for use from any thread.
+
+    Usage::
+
+        with client.events("volume_changed") as stream:
+            for event in stream:
+                print(event.name, event.data)
+    """
+
+    def __init__(self, threaded, stream):
+        self._threaded = threaded
+        self._stream = stream
+
+    @property
+    def dropped(self):
+        return self._stream.dropped
+
+    def get(self, timeout=None):
+        """
+        Return the next event, waiting up to ``timeout`` seconds.
+
+        :raises concurrent.futures.TimeoutError: if no event arrived in time
+        :raises StopIteration: if the stream was closed
+        """
+        self._threaded._check_thread("get")
+        fut = self._threaded.submit(self._stream.get)
+        try:
+            return fut.result(timeout)
+        except concurrent.futures.TimeoutError:
+            fut.cancel()
+            raise
+        except StopAsyncIteration:
+            raise StopIteration from None
+
+    def close(self):
+        self._threaded._check_thread("close")
+        self._threaded.submit(self._stream.close).result()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self.get()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ThreadedClient:
+
+    """
+    Thread-safe facade running one :class:`~mopidy_client.Client` on a
+    background event loop thread.
+
+    Any number of threads share its connection, caches and event
+    subscriptions. Calls return :class:`concurrent.futures.Future` objects::
+
+        client = ThreadedClient("ws://localhost:6680/mopidy/ws")
+        client.start()
+        state = client.playback.get_state().result()
+        client.on_volume_changed(lambda volume: print(volume))
+        client.stop()
+
+    Sync event handlers run in the client's executor by default so a slow
+    handler can't stall the event loop; pass ``threaded=False`` to run them
+    on the loop thread instead.
+
+    Methods that wait for the loop (:meth:`start`, :meth:`stop`,
+    :meth:`on_event`, :meth:`events` and the blocking methods of
+    :class:`ThreadedEventStream`) raise :class:`RuntimeError` when called
+    from the loop thread, e.g. from a handler registered with
+    ``threaded=False``, as they would deadlock. Use :attr:`client` there.
+
+    :param ws_url: websocket URL of the server
+    :param kwargs: passed on to :class:`~mopidy_client.Client`
+    """
+
+    def __init__(self, ws_url, **kwargs):
+        self._ws_url = ws_url
+        self._client_options = kwargs
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self.client = None
+        for name in _CONTROLLERS:
+            setattr(self, name, ControllerProxy(self, name))
+
+    @property
+    def loop(self):
+        """The event loop the wrapped client runs on."""
+        return self._loop
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self, started):
+        asyncio.set_event_loop(self._loop)
+        self._loop.call_soon(started.set)
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.run_until_complete(self._loop.shutdown_asyncgens())
+            self._loop.close()
+
+    def start(self, timeout=None, **kwargs):
+        """
+        Start the loop thread and connect, blocking until connected.
+
+        :param timeout: seconds to wait for the connection
+        :param kwargs: passed on to :meth:`~mopidy_client.Client.connect`
+        """
+        self._check_thread("start")
+        with self._lock:
+            if self.running:
+                return
+            self._loop = asyncio.new_event_loop()
+            started = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run,
+                args=(started,),
+                name=f"mopidy-client {self._ws_url}",
+                daemon=True,
+            )
+            self._thread.start()
+            started.wait()
+
+        self.client = self.submit(Client, self._ws_url, **self._client_options).result()
+        try:
+            self.submit(self.client.connect, **kwargs).result(timeout)
+        except BaseException:
+            self.stop()
+            raise
+
+    def stop(self, timeout=None):
+        """Disconnect, stop the loop and wait for the thread to finish."""
+        self._check_thread("stop")
+        with self._lock:
+            if not self.running:
+                return
+            if self.client is not None:
+                try:
+                    self.submit(self.client.disconnect).result(timeout)
+                except Exception:
+                    _LOGGER.debug("Disconnect failed", exc_info=True)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _check_thread(self, name):
+        if self._thread is not None and threading.current_thread() is self._thread:
+            raise RuntimeError(
+                f"{name}() waits for the event loop and can't be called from "
+                "the loop thread, use the wrapped client there"
+            )
+
+    async def _invoke(self, func, args, kwargs):
+        result = func(*args, **kwargs)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Run ``func`` with the arguments on the loop thread, awaiting its
+        result if it is awaitable.
+
+        :rtype: :class:`concurrent.futures.Future`
+        """
+        if not self.running:
+            raise RuntimeError("ThreadedClient is not started")
+        return asyncio.run_coroutine_threadsafe(
+            self._invoke(func, args, kwargs), self._loop
+        )
+
+    def call(self, method, **kwargs):
+        """
+        Call the JSON-RPC ``method``.
+
+        :rtype: :class:`concurrent.futures.Future` of the result
+        """
+        return self.submit(self.client.call, method, **kwargs)
+
+    def version(self):
+        return self.submit(self.client.version)
+
+    def on_event(self, event, handler, **options):
+        """
+        Register ``handler`` for ``event``, see
+        :meth:`~mopidy_client.Client.on_event`. Blocks until registered.
+
+        :rtype: callable removing the handler again, from any thread
+        """
+        if not asyncio.iscoroutinefunction(handler):
+            options.setdefault("threaded", True)
+        self._check_thread("on_event")
+        unsubscribe = self.submit(
+            self.client.on_event, event, handler, **options
+        ).result()
+        return partial(self._loop.call_soon_threadsafe, unsubscribe)
+
+    def __getattr__(self, name):
+        # on_volume_changed() and friends, registered through on_event()
+        if name.startswith("on_") and hasattr(Client, name):
+            return partial(self.on_event, name[3:])
+        raise AttributeError(name)
+
+    def events(self, *events, maxsize=100, overflow=DROP_OLDEST):
+        """
+        Return a :class:`ThreadedEventStream` of ``events``, or of every
+        event if none are given.
+        """
+        self._check_thread("events")
+        stream = self.submit(
+            self.client.events, *events, maxsize=maxsize, overflow=overflow
+        ).result()
+        return ThreadedEventStream(self, stream)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,30 @@
+import importlib
+
+from .base import Transport, TransportClosedError, TransportError, TransportStats
+
+__all__ = [
+    "Transport",
+    "TransportClosedError",
+    "TransportError",
+    "TransportStats",
+    "get_transport",
+]
+
+# Implementations are imported on first use, so selecting one transport
+# does not pull in the dependencies of the others.
+_TRANSPORTS = {
+    "tornado": "mopidy_client.transport.tornado_ws:TornadoTransport",
+    "asyncio": "mopidy_client.transport.asyncio_ws:AsyncioTransport",
+    "loopback": "mopidy_client.transport.loopback:LoopbackTransport",
+}
+
+
+def get_transport(name):
+    """Return the transport class registered as ``name``."""
+    try:
+        module_name, class_name = _TRANSPORTS[name].split(":")
+    except KeyError:
+        raise ValueError(
+            f"Expected transport to be one of {sorted(_TRANSPORTS)}, not {name!r}"
+        ) from None
+    return getattr(importlib.import_module(module_name), class_name)
@@ -0,0 +1,314 @@
+import asyncio
+import base64
+import hashlib
+import logging
+import os
+import ssl
+import struct
+import zlib
+from urllib.parse import urlsplit
+
+from .base import Transport, TransportClosedError, TransportError, TransportStats
+
+_LOGGER = logging.getLogger(__name__)
+
+_ACCEPT_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+OP_CONTINUATION = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+# Every permessage-deflate message ends in an empty stored block whose
+# trailer is removed on the wire (RFC 7692 section 7.2.1)
+_DEFLATE_TRAILER = b"\x00\x00\xff\xff"
+
+
+def _mask(payload, key):
+    """XOR ``payload`` with the 4 byte ``key`` (RFC 6455 section 5.3)."""
+    length = len(payload)
+    if not length:
+        return payload
+    # Treating the payload as one big integer is far faster than a Python
+    # level byte loop and needs no extension module.
+    repeated = (key * (length // 4 + 1))[:length]
+    masked = int.from_bytes(payload, "big") ^ int.from_bytes(repeated, "big")
+    return masked.to_bytes(length, "big")
+
+
+class _PerMessageDeflate:
+
+    """State of a negotiated permessage-deflate extension (RFC 7692)."""
+
+    def __init__(self, params, compression_level=6, mem_level=8, threshold=0):
+        self.compression_level = compression_level
+        self.mem_level = mem_level
+        self.threshold = threshold
+        self.client_no_context_takeover = "client_no_context_takeover" in params
+        self.server_no_context_takeover = "server_no_context_takeover" in params
+        self.client_wbits = int(params.get("client_max_window_bits") or 15)
+        self.server_wbits = int(params.get("server_max_window_bits") or 15)
+        self._compressor = None
+        self._decompressor = None
+
+    @classmethod
+    def parse(cls, header):
+        name, *params = [part.strip() for part in header.split(";")]
+        if name != "permessage-deflate":
+            return None
+        parsed = {}
+        for param in params:
+            key, _, value = param.partition("=")
+            parsed[key.strip()] = value.strip().strip('"') or None
+        return parsed
+
+    def compress(self, payload):
+        if self._compressor is None or self.client_no_context_takeover:
+            self._compressor = zlib.compressobj(
+                self.compression_level,
+                zlib.DEFLATED,
+                -self.client_wbits,
+                self.mem_level,
+            )
+        data = self._compressor.compress(payload)
+        data += self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        return data[: -len(_DEFLATE_TRAILER)]
+
+    def decompress(self, payload, max_length):
+        if self._decompressor is None or self.server_no_context_takeover:
+            self._decompressor = zlib.decompressobj(-self.server_wbits)
+        data = self._decompressor.decompress(payload + _DEFLATE_TRAILER, max_length)
+        if self._decompressor.unconsumed_tail:
+            raise TransportError(f"Message exceeds {max_length} bytes")
+        return data
+
+
+class AsyncioTransport(Transport):
+
+    """
+    Minimal RFC 6455 websocket client on top of :mod:`asyncio` streams.
+
+    It has no dependencies beyond the standard library and runs unchanged on
+    alternative event loops such as uvloop.
+
+    Supported connect options are ``headers``, ``connect_timeout``,
+    ``validate_cert`` and ``ssl_options`` (an :class:`ssl.SSLContext`);
+    other options are ignored. With compression enabled, messages shorter
+    than the ``threshold`` compression option are sent uncompressed.
+
+    :param max_message_size: largest accepted message in bytes
+    """
+
+    def __init__(self, max_message_size=10 * 1024 * 1024):
+        super().__init__()
+        self.max_message_size = max_message_size
+        self._reader = None
+        self._writer = None
+        self._write_lock = asyncio.Lock()
+        self._closed = True
+        self._deflate = None
+        self._compression = None
+        self.stats = TransportStats()
+
+    async def connect(self, url, compression=None, **options):
+        parts = urlsplit(url)
+        secure = parts.scheme == "wss"
+        host = parts.hostname
+        port = parts.port or (443 if secure else 80)
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+
+        ssl_context = None
+        if secure:
+            ssl_context = options.pop("ssl_options", None)
+            if ssl_context is None:
+                ssl_context = ssl.create_default_context()
+                if not options.pop("validate_cert", True):
+                    ssl_context.check_hostname = False
+                    ssl_context.verify_mode = ssl.CERT_NONE
+
+        self._compression = compression
+        timeout = options.pop("connect_timeout", None)
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port, ssl=ssl_context), timeout
+        )
+        await asyncio.wait_for(
+            self._handshake(parts.netloc, path, options.pop("headers", None)),
+            timeout,
+        )
+        self._closed = False
+
+    async def _handshake(self, netloc, path, headers):
+        key = base64.b64encode(os.urandom(16))
+        lines = [
+            f"GET {path} HTTP/1.1",
+            f"Host: {netloc}",
+            "Upgrade: websocket",
+            "Connection: Upgrade",
+            f"Sec-WebSocket-Key: {key.decode()}",
+            "Sec-WebSocket-Version: 13",
+        ]
+        if self._compression is not None:
+            lines.append(
+                "Sec-WebSocket-Extensions: permessage-deflate; client_max_window_bits"
+            )
+        for name, value in (headers or {}).items():
+            lines.append(f"{name}: {value}")
+        self._writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        await self._writer.drain()
+
+        response = await self._reader.readuntil(b"\r\n\r\n")
+        status, *header_lines = response.decode("latin-1").split("\r\n")
+        code = int(status.split(" ", 2)[1])
+        if code != 101:
+            self._writer.close()
+            raise TransportError(f"HTTP {code} from websocket handshake", code=code)
+
+        received = {}
+        for line in header_lines:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                received[name.strip().lower()] = value.strip()
+
+        expected = base64.b64encode(hashlib.sha1(key + _ACCEPT_GUID).digest())
+        if received.get("sec-websocket-accept", "").encode() != expected:
+            self._writer.close()
+            raise TransportError("Invalid Sec-WebSocket-Accept in handshake")
+        extensions = received.get("sec-websocket-extensions")
+        if extensions:
+            params = _PerMessageDeflate.parse(extensions)
+            if params is None or self._compression is None:
+                self._writer.close()
+                raise TransportError(f"Server negotiated unoffered {extensions}")
+            self._deflate = _PerMessageDeflate(params, **self._compression)
+            self.stats.compressed = True
+
+    def _frame(self, opcode, payload, rsv1=False):
+        first = 0x80 | opcode
+        if rsv1:
+            first |= 0x40
+        length = len(payload)
+        if length < 126:
+            header = struct.pack("!BB", first, 0x80 | length)
+        elif length < 1 << 16:
+            header = struct.pack("!BBH", first, 0x80 | 126, length)
+        else:
+            header = struct.pack("!BBQ", first, 0x80 | 127, length)
+        key = os.urandom(4)
+        return header + key + _mask(payload, key)
+
+    async def _send(self, opcode, payload, compress=False):
+        if self._closed:
+            raise TransportClosedError("Connection closed")
+        async with self._write_lock:
+            if compress:
+                # Compressing under the lock keeps the deflate context in the
+                # order frames hit the wire, even when a write is cancelled
+                # while waiting for the lock
+                payload = self._deflate.compress(payload)
+            frame = self._frame(opcode, payload, rsv1=compress)
+            self.stats.wire_bytes_out += len(frame)
+            self._writer.write(frame)
+            try:
+                await self._writer.drain()
+            except ConnectionError as ex:
+                self._closed = True
+                raise TransportClosedError("Connection lost") from ex
+
+    async def write(self, data):
+        payload = data.encode()
+        self.stats.messages_out += 1
+        self.stats.bytes_out += len(payload)
+        deflate = self._deflate
+        compress = deflate is not None and len(payload) >= deflate.threshold
+        await self._send(OP_TEXT, payload, compress=compress)
+
+    def _send_ping(self, data):
+        if self._closed:
+            raise TransportClosedError("Connection closed")
+        frame = self._frame(OP_PING, data)
+        self.stats.wire_bytes_out += len(frame)
+        self._writer.write(frame)
+
+    async def _read_frame(self):
+        first, second = await self._reader.readexactly(2)
+        length = second & 0x7F
+        header_length = 2
+        if length == 126:
+            (length,) = struct.unpack("!H", await self._reader.readexactly(2))
+            header_length += 2
+        elif length == 127:
+            (length,) = struct.unpack("!Q", await self._reader.readexactly(8))
+            header_length += 8
+        self.stats.wire_bytes_in += header_length + length
+        if length > self.max_message_size:
+            raise TransportError(f"Frame of {length} bytes exceeds limit")
+        if second & 0x80:
+            key = await self._reader.readexactly(4)
+            payload = _mask(await self._reader.readexactly(length), key)
+        else:
+            payload = await self._reader.readexactly(length)
+        return bool(first & 0x80), bool(first & 0x40), first & 0x0F, payload
+
+    async def read(self):
+        fragments = []
+        message_opcode = None
+        compressed = False
+        try:
+            while True:
+                fin, rsv1, opcode, payload = await self._read_frame()
+                if opcode == OP_PING:
+                    if not self._closed:
+                        self._writer.write(self._frame(OP_PONG, payload))
+                    continue
+                if opcode == OP_PONG:
+                    self._on_pong(payload)
+                    continue
+                if opcode == OP_CLOSE:
+                    _LOGGER.debug("Received close frame")
+                    if not self._closed:
+                        self._writer.write(self._frame(OP_CLOSE, payload[:2]))
+                    self._shutdown()
+                    return None
+
+                if opcode != OP_CONTINUATION:
+                    message_opcode = opcode
+                    compressed = rsv1
+                fragments.append(payload)
+                if fin:
+                    message = b"".join(fragments)
+                    if compressed:
+                        if self._deflate is None:
+                            raise TransportError("Compressed frame without deflate")
+                        message = self._deflate.decompress(
+                            message, self.max_message_size
+                        )
+                    self.stats.messages_in += 1
+                    self.stats.bytes_in += len(message)
+                    if message_opcode == OP_TEXT:
+                        return message.decode()
+                    return message
+        except (asyncio.IncompleteReadError, ConnectionError):
+            self._shutdown()
+            return None
+        except TransportError as ex:
+            _LOGGER.warning("Closing connection: %s", ex)
+            self.close()
+            return None
+
+    def _shutdown(self):
+        self._closed = True
+        if self._writer is not None:
+            self._writer.close()
+
+    def close(self):
+        if self._closed:
+            return
+        try:
+            self._writer.write(self._frame(OP_CLOSE, struct.pack("!H", 1000)))
+        except ConnectionError:
+            pass
+        self._shutdown()
@@ -0,0 +1,133 @@
+import asyncio
+import itertools
+
+
+class TransportError(Exception):
+
+    """
+    Raised when a transport fails to connect or the connection is lost.
+
+    :param code: HTTP status code of a failed handshake, if any
+    """
+
+    def __init__(self, message, code=None):
+        super().__init__(message)
+        self.code = code
+
+
+class TransportClosedError(TransportError):
+    pass
+
+
+class TransportStats:
+
+    """
+    Per-connection traffic counters.
+
+    ``bytes_in``/``bytes_out`` count message payloads before compression,
+    ``wire_bytes_in``/``wire_bytes_out`` what actually crossed the socket
+    including websocket framing.
+    """
+
+    __slots__ = [
+        "messages_in",
+        "messages_out",
+        "bytes_in",
+        "bytes_out",
+        "wire_bytes_in",
+        "wire_bytes_out",
+        "compressed",
+    ]
+
+    def __init__(self):
+        self.messages_in = 0
+        self.messages_out = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.wire_bytes_in = 0
+        self.wire_bytes_out = 0
+        #: Whether permessage-deflate was negotiated.
+        self.compressed = False
+
+    @property
+    def ratio_in(self):
+        """Wire bytes per message byte received, lower is better."""
+        return self.wire_bytes_in / self.bytes_in if self.bytes_in else 1.0
+
+    @property
+    def ratio_out(self):
+        """Wire bytes per message byte sent, lower is better."""
+        return self.wire_bytes_out / self.bytes_out if self.bytes_out else 1.0
+
+    def as_dict(self):
+        data = {key: getattr(self, key) for key in self.__slots__}
+        data["ratio_in"] = self.ratio_in
+        data["ratio_out"] = self.ratio_out
+        return data
+
+
+class Transport:
+
+    """
+    A message based connection to a Mopidy JSON-RPC endpoint.
+
+    :class:`~mopidy_client.Client` creates one transport per connection and
+    reads from it in a single loop, so implementations only need to support
+    one concurrent :meth:`read` and any number of concurrent :meth:`write`.
+    """
+
+    #: :class:`TransportStats` of the connection.
+    stats = None
+
+    def __init__(self):
+        self._pings = {}
+        self._ping_ids = itertools.count()
+
+    async def connect(self, url, compression=None, **options):
+        """
+        Open the connection to ``url``.
+
+        :param compression: :class:`None` to disable compression, or a dict
+            of permessage-deflate options: ``compression_level`` (0-9),
+            ``mem_level`` (1-9) and ``threshold``, the smallest message in
+            bytes worth compressing
+        :raises TransportError: if the server refused the connection
+        """
+        raise NotImplementedError
+
+    async def read(self):
+        """
+        Return the next message, or :class:`None` once the connection is
+        closed.
+        """
+        raise NotImplementedError
+
+    async def write(self, data):
+        """
+        Send the message ``data``.
+
+        :raises TransportClosedError: if the connection is closed
+        """
+        raise NotImplementedError
+
+    def close(self):
+        raise NotImplementedError
+
+    def _send_ping(self, data):
+        raise NotImplementedError
+
+    async def ping(self):
+        """Send a ping and wait for the matching pong."""
+        data = str(next(self._ping_ids)).encode()
+        fut = asyncio.get_running_loop().create_future()
+        self._pings[data] = fut
+        try:
+            self._send_ping(data)
+            await fut
+        finally:
+            self._pings.pop(data, None)
+
+    def _on_pong(self, data):
+        fut = self._pings.get(bytes(data))
+        if fut is not None and not fut.done():
+            fut.set_result(None)
@@ -0,0 +1,65 @@
+import asyncio
+
+from .base import Transport, TransportClosedError, TransportStats
+
+
+class LoopbackTransport(Transport):
+
+    """
+    In-process transport connected directly to a server object, without
+    sockets or websocket framing.
+
+    The server must provide ``attach(connection)``, ``detach(connection)``
+    and ``receive(connection, message)``, and answer by calling
+    ``connection.deliver(message)``. See
+    :class:`~mopidy_client.testing.FakeMopidy`.
+
+    Usage::
+
+        server = FakeMopidy()
+        client = Client("loopback://", transport=server.transport)
+    """
+
+    def __init__(self, server):
+        super().__init__()
+        self._server = server
+        self._incoming = asyncio.Queue()
+        self._closed = True
+        self.stats = TransportStats()
+
+    async def connect(self, url, compression=None, **options):
+        self._closed = False
+        self._server.attach(self)
+
+    async def read(self):
+        data = await self._incoming.get()
+        if data is not None:
+            self.stats.messages_in += 1
+            self.stats.bytes_in += len(data)
+            self.stats.wire_bytes_in += len(data)
+        return data
+
+    async def write(self, data):
+        if self._closed:
+            raise TransportClosedError("Connection closed")
+        self.stats.messages_out += 1
+        self.stats.bytes_out += len(data)
+        self.stats.wire_bytes_out += len(data)
+        self._server.receive(self, data)
+
+    def _send_ping(self, data):
+        if self._closed:
+            raise TransportClosedError("Connection closed")
+        asyncio.get_running_loop().call_soon(self._on_pong, data)
+
+    def deliver(self, data):
+        """Queue ``data`` to be read by the client."""
+        if not self._closed:
+            self._incoming.put_nowait(data)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._server.detach(self)
+        self._incoming.put_nowait(None)
@@ -0,0 +1,77 @@
+from tornado import websocket
+from tornado.httpclient import HTTPClientError, HTTPRequest
+
+from .base import Transport, TransportClosedError, TransportError, TransportStats
+
+
+class TornadoTransport(Transport):
+
+    """
+    Transport using :func:`tornado.websocket.websocket_connect`.
+
+    Connect options are passed on to :class:`tornado.httpclient.HTTPRequest`.
+    Tornado compresses every message once permessage-deflate is negotiated,
+    the ``threshold`` compression option is not supported.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._ws = None
+        self._messages_in = 0
+        self._messages_out = 0
+
+    async def connect(self, url, compression=None, **options):
+        compression_options = None
+        if compression is not None:
+            compression_options = {
+                key: compression[key]
+                for key in ("compression_level", "mem_level")
+                if key in compression
+            }
+        request = HTTPRequest(url, **options)
+        try:
+            self._ws = await websocket.websocket_connect(
+                request, compression_options=compression_options
+            )
+        except HTTPClientError as ex:
+            raise TransportError(str(ex), code=ex.code) from ex
+        # The protocol calls the connection's on_pong hook for every pong
+        self._ws.on_pong = self._on_pong
+
+    @property
+    def stats(self):
+        stats = TransportStats()
+        stats.messages_in = self._messages_in
+        stats.messages_out = self._messages_out
+        protocol = self._ws.protocol if self._ws is not None else None
+        if protocol is not None:
+            # Tornado keeps these counters itself, if only privately
+            stats.bytes_in = protocol._message_bytes_in
+            stats.bytes_out = protocol._message_bytes_out
+            stats.wire_bytes_in = protocol._wire_bytes_in
+            stats.wire_bytes_out = protocol._wire_bytes_out
+            stats.compressed = getattr(protocol, "_compressor", None) is not None
+        return stats
+
+    async def read(self):
+        data = await self._ws.read_message()
+        if data is not None:
+            self._messages_in += 1
+        return data
+
+    async def write(self, data):
+        try:
+            await self._ws.write_message(data)
+        except websocket.WebSocketClosedError as ex:
+            raise TransportClosedError("Connection closed") from ex
+        self._messages_out += 1
+
+    def _send_ping(self, data):
+        try:
+            self._ws.ping(data)
+        except websocket.WebSocketClosedError as ex:
+            raise TransportClosedError("Connection closed") from ex
+
+    def close(self):
+        if self._ws is not None:
+            self._ws.close()
@@ -18,6 +18,12 @@ setuptools.setup(
     ],
     install_requires=[
         "tornado>=6.0",
+        "typing_extensions; python_version < '3.8'",
     ],
+    entry_points={
+        "console_scripts": [
+            "mopidy-client = mopidy_client.cli:main",
+        ],
+    },
     python_requires=">=3.7",
 )
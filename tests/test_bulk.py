@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from mopidy_client import Client
+from mopidy_client.bulk import PipelineError, pipeline
+from mopidy_client.models import TlTrack, Track
+from mopidy_client.testing import FakeMopidy, FakeMopidyServer
+
+
+def _tracklist():
+    tracklist = []
+    sent = []
+
+    def add(uris, at_position=None):
+        sent.append(uris)
+        if any(uri.endswith(":bad") for uri in uris):
+            raise ValueError("Could not resolve")
+        added = [
+            TlTrack(tlid=len(tracklist) + i + 1, track=Track(uri=uri))
+            for i, uri in enumerate(uris)
+        ]
+        tracklist.extend(added)
+        return added
+
+    return FakeMopidy({"core.tracklist.add": add}), tracklist, sent
+
+
+@pytest.mark.parametrize("window", [1, 4])
+def test_bulk_add_stops_after_failed_chunk(window):
+    async def main():
+        fake, tracklist, sent = _tracklist()
+        server = FakeMopidyServer(fake, latency=0.01)
+        await server.start()
+        client = Client(server.url)
+        await client.connect()
+
+        uris = [f"local:{i}" for i in range(100)]
+        uris[7] = "local:bad"
+        with pytest.raises(PipelineError) as info:
+            await client.tracklist.bulk_add(uris, chunk_size=5, window=window)
+        assert info.value.index == 1
+        assert isinstance(info.value.__cause__, Exception)
+        # Only chunks sent before the failure was known were sent
+        assert len(sent) <= 1 + window
+        assert info.value.results == tracklist
+        assert len(tracklist) == 5 * (len(sent) - 1)
+        await client.disconnect()
+        server.stop()
+
+    asyncio.run(main())
+
+
+def test_pipeline_returns_results_in_order():
+    async def main():
+        async def call(i):
+            await asyncio.sleep(0.001 * (5 - i))
+            return i
+
+        calls = [lambda i=i: call(i) for i in range(5)]
+        progress = []
+        results = await pipeline(
+            calls, window=2, progress=lambda *args: progress.append(args)
+        )
+        assert results == list(range(5))
+        assert progress[-1] == (5, 5)
+
+    asyncio.run(main())
@@ -0,0 +1,38 @@
+import pytest
+
+from mopidy_client import cli
+from mopidy_client.client import JsonRpcException
+
+
+@pytest.mark.parametrize(
+    "error, expected",
+    [
+        (
+            {"code": -32601, "message": "Method not found"},
+            "Error -32601: Method not found\n",
+        ),
+        (
+            {
+                "code": -32601,
+                "message": "Method not found",
+                "data": 'Unknown method "core.playback.typo"',
+            },
+            'Error -32601: Method not found\nUnknown method "core.playback.typo"\n',
+        ),
+        (
+            {
+                "code": 0,
+                "message": "Application error",
+                "data": {"type": "ValueError", "message": "bad", "traceback": "..."},
+            },
+            "Error 0: Application error\nbad\n",
+        ),
+    ],
+)
+def test_call_error_is_reported(monkeypatch, capsys, error, expected):
+    async def run(args):
+        raise JsonRpcException(error)
+
+    monkeypatch.setattr(cli, "_run", run)
+    assert cli.main(["call", "playback.typo"]) == 1
+    assert capsys.readouterr().err == expected
@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from mopidy_client import Client
+from mopidy_client.dispatch import BLOCK
+from mopidy_client.testing import FakeMopidy, FakeMopidyServer
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_call_returns_result():
+    async def main():
+        server = FakeMopidy({"core.playback.get_state": "playing"})
+        client = Client("loopback://", transport=server.transport)
+        await client.connect()
+        assert await client.playback.get_state() == "playing"
+        await client.disconnect()
+
+    run(main())
+
+
+def test_late_response_to_cancelled_call_is_ignored():
+    async def main():
+        server = FakeMopidyServer(latency=0.1)
+        await server.start()
+        client = Client(server.url)
+        await client.connect()
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(client.core.get_version(), 0.01)
+        await asyncio.sleep(0.2)
+        assert client._req == {}
+        assert await asyncio.wait_for(client.core.get_version(), 1) == "3.4.2"
+        await client.disconnect()
+        server.stop()
+
+    run(main())
+
+
+def test_malformed_message_does_not_stop_reading():
+    async def main():
+        server = FakeMopidy()
+        client = Client("loopback://", transport=server.transport)
+        await client.connect()
+        for connection in server.connections:
+            connection.deliver("{not json")
+        assert await asyncio.wait_for(client.core.get_version(), 1) == "3.4.2"
+        await client.disconnect()
+
+    run(main())
+
+
+def test_blocked_reading_does_not_miss_pongs():
+    async def main():
+        server = FakeMopidyServer()
+        await server.start()
+        client = Client(
+            server.url, transport="asyncio", ping_interval=0.05, auto_reconnect=False
+        )
+        await client.connect()
+        async with client.events("volume_changed", maxsize=1, overflow=BLOCK) as stream:
+            for volume in range(3):
+                server.fake.emit("volume_changed", volume=volume)
+            # Reading is stalled on the full stream for several ping intervals
+            await asyncio.sleep(0.4)
+            assert client._keepalive.missed == 0
+            for volume in range(3):
+                event = await asyncio.wait_for(stream.__anext__(), 1)
+                assert event.data == {"volume": volume}
+        assert await asyncio.wait_for(client.core.get_version(), 1) == "3.4.2"
+        await client.disconnect()
+        server.stop()
+
+    asyncio.run(main())
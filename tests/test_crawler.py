@@ -0,0 +1,65 @@
+import asyncio
+
+from mopidy_client import Client
+from mopidy_client.models import Ref, Track
+from mopidy_client.testing import FakeMopidy
+
+URIS = [f"local:track:{i}" for i in range(20)]
+
+
+def fake_library():
+    def browse(uri):
+        if uri is None:
+            return [Ref.track(uri=uri, name=uri) for uri in URIS]
+        return []
+
+    def lookup(uris):
+        return {uri: [Track(uri=uri)] for uri in uris}
+
+    return FakeMopidy({"core.library.browse": browse, "core.library.lookup": lookup})
+
+
+def test_crawl_yields_every_track():
+    async def main():
+        server = fake_library()
+        client = Client("loopback://", transport=server.transport)
+        await client.connect()
+        tracks = [track async for track in client.library.crawl(batch_size=7)]
+        assert sorted(track.uri for track in tracks) == sorted(URIS)
+        await client.disconnect()
+
+    asyncio.run(main())
+
+
+def test_interrupted_crawl_resumes_without_losing_tracks(tmp_path):
+    checkpoint = str(tmp_path / "crawl.json")
+
+    async def main():
+        server = fake_library()
+        client = Client("loopback://", transport=server.transport)
+        await client.connect()
+
+        first = []
+        crawl = client.library.crawl(
+            batch_size=10, concurrency=1, checkpoint=checkpoint
+        )
+        async for track in crawl:
+            first.append(track.uri)
+            if len(first) == 3:
+                break
+        await crawl.aclose()
+
+        resumed = [
+            track.uri
+            async for track in client.library.crawl(
+                batch_size=10, concurrency=1, checkpoint=checkpoint
+            )
+        ]
+        await client.disconnect()
+        return first, resumed
+
+    first, resumed = asyncio.run(main())
+    assert set(first) | set(resumed) == set(URIS)
+    # Only the track being consumed when the crawl stopped is repeated
+    assert len(resumed) == len(URIS) - len(first) + 1
+    assert not (tmp_path / "crawl.json").exists()
@@ -0,0 +1,111 @@
+import asyncio
+import builtins
+import inspect
+
+import pytest
+
+from mopidy_client import Client
+from mopidy_client.describe import apply_description, build_method
+from mopidy_client.testing import FakeMopidy
+
+
+def test_described_methods_are_per_client():
+    async def main():
+        plain = FakeMopidy({"core.playback.get_state": "playing"})
+        extended = FakeMopidy(
+            {
+                "core.playback.get_state": "paused",
+                "core.playback.get_lyrics": lambda tlid=None: "la la",
+            }
+        )
+        first = Client("loopback://", transport=plain.transport)
+        second = Client("loopback://", transport=extended.transport)
+        await first.connect()
+        await second.connect()
+        await first.describe()
+        await second.describe()
+
+        assert await first.playback.get_state() == "playing"
+        assert await second.playback.get_lyrics(tlid=1) == "la la"
+        with pytest.raises(AttributeError):
+            first.playback.get_lyrics
+        with pytest.raises(AttributeError):
+            first.playback.get_stat
+        with pytest.raises(TypeError):
+            second.playback.get_lyrics(track=1)
+
+        await first.disconnect()
+        await second.disconnect()
+
+    asyncio.run(main())
+
+
+def test_undescribed_client_calls_any_method():
+    async def main():
+        fake = FakeMopidy({"core.mixer.get_volume": 42})
+        client = Client("loopback://", transport=fake.transport)
+        await client.connect()
+        assert await client.mixer.get_volume() == 42
+        await client.disconnect()
+
+    asyncio.run(main())
+
+
+def test_hostile_descriptions_run_no_code():
+    code = "x(self):\n    pass\nimport builtins; builtins._injected = 1\ndef y"
+    description = {
+        f"core.playback.{code}": {"params": []},
+        "core.playback.get-thing": {"params": []},
+        "core.playback.class": {"params": []},
+        "core.playback.seek": {"params": [{"name": "class"}]},
+        "core.playback.next": {"params": [{"name": code}]},
+        "core.playback.stop": {"params": [{"name": "a"}, {"name": "a"}]},
+        "core.playback.play": "not a spec",
+        "core.playback.get_state": {
+            "params": [{"name": "a", "default": 1}, {"name": "b"}]
+        },
+    }
+
+    async def main():
+        fake = FakeMopidy(
+            {
+                "core.playback.seek": lambda **kwargs: kwargs,
+                "core.playback.get_state": lambda **kwargs: kwargs,
+            }
+        )
+        client = Client("loopback://", transport=fake.transport)
+        await client.connect()
+        apply_description(client, description)
+        assert not hasattr(builtins, "_injected")
+        with pytest.raises(AttributeError):
+            client.playback.play
+        assert await client.playback.seek(**{"class": 1}) == {"class": 1}
+        assert await client.playback.get_state(b=2) == {"b": 2}
+        await client.disconnect()
+
+    asyncio.run(main())
+
+
+def test_build_method_binds_arguments():
+    calls = []
+
+    class Controller:
+        def call(self, method, **kwargs):
+            calls.append((method, kwargs))
+
+    meth = build_method(
+        "add",
+        [
+            {"name": "uris"},
+            {"name": "at_position", "default": None},
+            {"name": "rest", "varargs": True},
+            {"name": "extra", "kwargs": True},
+        ],
+        "Add tracks.",
+    )
+    meth(Controller(), ["a"], flag=True)
+    assert calls == [("add", {"uris": ["a"], "at_position": None, "flag": True})]
+    assert meth.__doc__ == "Add tracks."
+    assert str(inspect.signature(meth)) == "(self, uris, at_position=None, **extra)"
+    with pytest.raises(TypeError):
+        meth(Controller())
@@ -0,0 +1,209 @@
+import asyncio
+import threading
+
+import pytest
+
+from mopidy_client.dispatch import BLOCK, DROP_NEWEST, DROP_OLDEST, EventDispatcher
+
+
+def test_handler_unsubscribing_itself_runs_to_completion():
+    async def main():
+        dispatcher = EventDispatcher()
+        seen = []
+
+        async def handler(volume):
+            dispatcher.unsubscribe(listener)
+            await asyncio.sleep(0)
+            seen.append(volume)
+
+        listener = dispatcher.subscribe("volume_changed", handler)
+        dispatcher.dispatch("volume_changed", {"volume": 1})
+        dispatcher.dispatch("volume_changed", {"volume": 2})
+        await asyncio.sleep(0.01)
+        assert seen == [1]
+        assert not listener.active
+
+    asyncio.run(main())
+
+
+def test_events_are_delivered_in_order_per_listener():
+    async def main():
+        dispatcher = EventDispatcher()
+        slow, fast = [], []
+
+        async def slow_handler(volume):
+            await asyncio.sleep(0.001 * (5 - volume))
+            slow.append(volume)
+
+        dispatcher.subscribe("volume_changed", slow_handler)
+        dispatcher.subscribe("volume_changed", lambda volume: fast.append(volume))
+        for volume in range(5):
+            dispatcher.dispatch("volume_changed", {"volume": volume})
+        await asyncio.sleep(0)
+        # The sync handler isn't held up by the slow one
+        assert fast == [0, 1, 2, 3, 4]
+        assert slow == []
+        await asyncio.sleep(0.05)
+        assert slow == [0, 1, 2, 3, 4]
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize(
+    "overflow, expected", [(DROP_OLDEST, [2, 3, 4]), (DROP_NEWEST, [0, 1, 2])]
+)
+def test_listener_overflow(overflow, expected):
+    async def main():
+        dispatcher = EventDispatcher()
+        seen = []
+        listener = dispatcher.subscribe(
+            "seeked",
+            lambda time_position: seen.append(time_position),
+            maxsize=3,
+            overflow=overflow,
+        )
+        for position in range(5):
+            dispatcher.dispatch("seeked", {"time_position": position})
+        await asyncio.sleep(0.01)
+        assert seen == expected
+        assert listener.stats.dropped == 2
+        assert listener.stats.max_depth == 3
+        assert listener.stats.delivered == 3
+
+    asyncio.run(main())
+
+
+def test_threaded_handler_runs_off_the_loop():
+    async def main():
+        dispatcher = EventDispatcher()
+        threads = []
+        dispatcher.subscribe(
+            "volume_changed",
+            lambda volume: threads.append(threading.get_ident()),
+            threaded=True,
+        )
+        dispatcher.dispatch("volume_changed", {"volume": 1})
+        await asyncio.sleep(0.05)
+        assert len(threads) == 1
+        assert threads[0] != threading.get_ident()
+
+    asyncio.run(main())
+
+
+def test_coalesce_keeps_latest_while_busy():
+    async def main():
+        dispatcher = EventDispatcher()
+        seen = []
+
+        async def handler(volume):
+            await asyncio.sleep(0.01)
+            seen.append(volume)
+
+        listener = dispatcher.subscribe("volume_changed", handler, coalesce=True)
+        dispatcher.dispatch("volume_changed", {"volume": 0})
+        await asyncio.sleep(0)
+        for volume in range(1, 5):
+            dispatcher.dispatch("volume_changed", {"volume": volume})
+        await asyncio.sleep(0.05)
+        assert seen == [0, 4]
+        assert listener.stats.coalesced == 3
+
+    asyncio.run(main())
+
+
+def test_debounce_delivers_last_event_of_burst():
+    async def main():
+        dispatcher = EventDispatcher()
+        seen = []
+        listener = dispatcher.subscribe(
+            "volume_changed", lambda volume: seen.append(volume), debounce=0.02
+        )
+        for volume in range(5):
+            dispatcher.dispatch("volume_changed", {"volume": volume})
+            await asyncio.sleep(0.005)
+        assert seen == []
+        await asyncio.sleep(0.05)
+        assert seen == [4]
+        assert listener.stats.coalesced == 4
+
+    asyncio.run(main())
+
+
+def test_throttle_delivers_first_and_last_event_of_burst():
+    async def main():
+        dispatcher = EventDispatcher()
+        seen = []
+        dispatcher.subscribe(
+            "volume_changed", lambda volume: seen.append(volume), throttle=0.05
+        )
+        for volume in range(5):
+            dispatcher.dispatch("volume_changed", {"volume": volume})
+        await asyncio.sleep(0.01)
+        assert seen == [0]
+        await asyncio.sleep(0.08)
+        assert seen == [0, 4]
+
+    asyncio.run(main())
+
+
+def test_failing_handler_is_counted_and_keeps_receiving():
+    async def main():
+        dispatcher = EventDispatcher()
+        seen = []
+
+        def handler(volume):
+            seen.append(volume)
+            if volume == 0:
+                raise ValueError("broken")
+
+        dispatcher.subscribe("volume_changed", handler)
+        dispatcher.dispatch("volume_changed", {"volume": 0})
+        dispatcher.dispatch("volume_changed", {"volume": 1})
+        await asyncio.sleep(0.01)
+        assert seen == [0, 1]
+        (stats,) = dispatcher.stats()["volume_changed"]
+        assert stats["errors"] == 1
+        assert stats["delivered"] == 2
+        assert stats["depth"] == 0
+        assert stats["latency_max"] >= stats["latency_avg"] >= 0
+
+    asyncio.run(main())
+
+
+def test_listener_options_are_validated():
+    dispatcher = EventDispatcher()
+    for options in (
+        {"overflow": BLOCK},
+        {"maxsize": 0},
+        {"debounce": 1, "throttle": 1},
+    ):
+        with pytest.raises(ValueError):
+            dispatcher.subscribe("seeked", print, **options)
+
+
+def test_stream_overflow_and_block():
+    async def main():
+        dispatcher = EventDispatcher()
+        dropping = dispatcher.stream(maxsize=2)
+        blocking = dispatcher.stream(["seeked"], maxsize=2, overflow=BLOCK)
+        assert dispatcher.dispatch("seeked", {"time_position": 0}) is None
+        assert dispatcher.dispatch("volume_changed", {"volume": 1}) is None
+        assert dispatcher.dispatch("seeked", {"time_position": 2}) is None
+        pending = dispatcher.dispatch("seeked", {"time_position": 3})
+        assert pending is not None
+
+        assert dropping.dropped == 2
+        assert [event.name for event in (dropping.get_nowait(),)] == ["seeked"]
+
+        assert (await blocking.get()).data == {"time_position": 0}
+        await asyncio.wait_for(pending, 1)
+        assert (await blocking.get()).data == {"time_position": 2}
+        assert (await blocking.get()).data == {"time_position": 3}
+
+        blocking.close()
+        dropping.close()
+        assert dispatcher.dispatch("seeked", {"time_position": 4}) is None
+        with pytest.raises(StopAsyncIteration):
+            await blocking.get()
+
+    asyncio.run(main())
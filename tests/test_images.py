@@ -0,0 +1,100 @@
+import asyncio
+import concurrent.futures
+import os
+
+from tornado import httpserver, netutil, web
+
+from mopidy_client import Client
+from mopidy_client.images import DiskCache, ImageService, best_image
+from mopidy_client.models import Image
+from mopidy_client.testing import FakeMopidy
+
+
+class _ImageHandler(web.RequestHandler):
+    def initialize(self, requests):
+        self.requests = requests
+
+    async def get(self, name):
+        self.requests.append(name)
+        await asyncio.sleep(0.02)
+        self.write(name.encode() * 100)
+
+
+async def _image_server(requests):
+    app = web.Application([(r"/images/(.*)", _ImageHandler, {"requests": requests})])
+    sockets = netutil.bind_sockets(0, "127.0.0.1")
+    server = httpserver.HTTPServer(app)
+    server.add_sockets(sockets)
+    return server, f"http://127.0.0.1:{sockets[0].getsockname()[1]}/"
+
+
+def test_best_image():
+    small = Image(uri="small", width=64, height=64)
+    large = Image(uri="large", width=600, height=600)
+    unsized = Image(uri="unsized")
+    assert best_image([]) is None
+    assert best_image([unsized]) is unsized
+    assert best_image([unsized, small, large]) is large
+    assert best_image([large, small], 50, 50) is small
+    assert best_image([large, small], 300) is large
+    assert best_image([large, small], 1000, 1000) is large
+
+
+def test_concurrent_fetches_share_one_download(tmp_path):
+    async def main():
+        requests = []
+        http, base_url = await _image_server(requests)
+        fake = FakeMopidy(
+            {
+                "core.library.get_images": lambda uris: {
+                    uri: [
+                        Image(uri="/images/small", width=64, height=64),
+                        Image(uri="/images/large", width=600, height=600),
+                    ]
+                    for uri in uris
+                }
+            }
+        )
+        client = Client("loopback://", transport=fake.transport)
+        await client.connect()
+        images = ImageService(client, cache_dir=str(tmp_path), base_url=base_url)
+
+        results = await asyncio.gather(
+            *(images.fetch("local:album:a", width=300, height=300) for _ in range(5))
+        )
+        assert results == [b"large" * 100] * 5
+        assert requests == ["large"]
+
+        # Served from the disk cache by a new service
+        fresh = ImageService(client, cache_dir=str(tmp_path), base_url=base_url)
+        assert await fresh.download("/images/large") == b"large" * 100
+        assert requests == ["large"]
+
+        images.close()
+        fresh.close()
+        await client.disconnect()
+        http.stop()
+
+    asyncio.run(main())
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    cache = DiskCache(str(tmp_path), maxsize=250)
+    cache.set("a", b"a" * 100)
+    cache.set("b", b"b" * 100)
+    os.utime(cache._filename("a"), (0, 0))
+    os.utime(cache._filename("b"), (1, 1))
+    assert cache.get("a") == b"a" * 100
+    cache.set("c", b"c" * 100)
+    assert cache.get("b") is None
+    assert cache.get("a") == b"a" * 100
+    assert cache.size == 200
+    assert DiskCache(str(tmp_path), maxsize=250).size == 200
+
+
+def test_disk_cache_size_stays_consistent_across_threads(tmp_path):
+    cache = DiskCache(str(tmp_path), maxsize=1000)
+    with concurrent.futures.ThreadPoolExecutor(8) as executor:
+        list(executor.map(lambda i: cache.set(str(i % 20), b"x" * 50), range(400)))
+    on_disk = sum(size for _, _, size in cache._entries())
+    assert cache.size == on_disk <= 1000
@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from mopidy_client import Client
+from mopidy_client.client import JsonRpcException
+from mopidy_client.metrics import ClientMetrics
+from mopidy_client.models import Track
+from mopidy_client.testing import FakeMopidy
+
+
+def _samples(text):
+    samples = {}
+    for line in text.splitlines():
+        if not line.startswith("#"):
+            name, _, value = line.rpartition(" ")
+            samples[name] = float(value)
+    return samples
+
+
+def test_prometheus_output_of_client_run():
+    async def main():
+        metrics = ClientMetrics()
+        fake = FakeMopidy(
+            {
+                "core.playback.get_current_track": Track(uri="local:a"),
+                "core.playback.get_state": "playing",
+            }
+        )
+        client = Client("loopback://", transport=fake.transport, metrics=metrics)
+        await client.connect()
+        await client.playback.get_current_track()
+        await client.playback.get_state()
+        await client.playback.get_state()
+        with pytest.raises(JsonRpcException):
+            await client.call("core.playback.typo")
+
+        def handler(volume):
+            raise ValueError("broken")
+
+        client.on_volume_changed(handler)
+        fake.emit("volume_changed", volume=1)
+        fake.emit('bad"\\\nevent')
+        await asyncio.sleep(0.01)
+        await client.disconnect()
+        return metrics.prometheus()
+
+    text = asyncio.run(main())
+    samples = _samples(text)
+    p = "mopidy_client"
+    method = 'method="core.playback.get_state"'
+    assert samples[f"{p}_request_duration_seconds_count{{{method}}}"] == 2
+    assert samples[f'{p}_request_duration_seconds_bucket{{{method},le="+Inf"}}'] == 2
+    assert samples[f"{p}_requests_in_flight{{{method}}}"] == 0
+    assert samples[f'{p}_request_errors_total{{method="core.playback.typo"}}'] == 1
+    assert samples[f"{p}_models_total"] >= 1
+    assert samples[f'{p}_events_total{{event="volume_changed"}}'] == 1
+    assert samples[f'{p}_handler_errors_total{{event="volume_changed"}}'] == 1
+    # Every line is a comment or one sample, with label values escaped
+    assert samples[f'{p}_events_total{{event="bad\\"\\\\\\nevent"}}'] == 1
+    assert text.endswith("\n")
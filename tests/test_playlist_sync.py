@@ -0,0 +1,64 @@
+import asyncio
+
+from mopidy_client import Client
+from mopidy_client.models import Playlist, Ref
+from mopidy_client.playlist_sync import PlaylistSync
+from mopidy_client.testing import FakeMopidy
+
+
+def test_playlists_loaded_picks_up_edited_playlist():
+    playlists = {"m3u:a": Playlist(uri="m3u:a", name="A", last_modified=1)}
+
+    async def main():
+        server = FakeMopidy(
+            {
+                "core.playlists.as_list": lambda: [
+                    Ref.playlist(uri=p.uri, name=p.name) for p in playlists.values()
+                ],
+                "core.playlists.lookup": lambda uri: playlists.get(uri),
+            }
+        )
+        client = Client("loopback://", transport=server.transport)
+        await client.connect()
+        sync = PlaylistSync(client)
+        await sync.start()
+        assert sync.playlists["m3u:a"].last_modified == 1
+
+        # Edited on disk, same name, then the backend reloads
+        playlists["m3u:a"] = playlists["m3u:a"].replace(last_modified=2)
+        server.emit("playlists_loaded")
+        for _ in range(50):
+            await asyncio.sleep(0.01)
+            if sync.playlists["m3u:a"].last_modified == 2:
+                break
+        assert sync.playlists["m3u:a"].last_modified == 2
+        sync.stop()
+        await client.disconnect()
+
+    asyncio.run(main())
+
+
+def test_stale_lookup_does_not_overwrite_newer_event():
+    old = Playlist(uri="m3u:a", name="A", last_modified=1)
+    new = old.replace(last_modified=5)
+
+    async def main():
+        def lookup(uri):
+            # The edit's event overtakes the response to this lookup
+            server.emit("playlist_changed", playlist=new)
+            return old
+
+        server = FakeMopidy(
+            {
+                "core.playlists.as_list": [Ref.playlist(uri="m3u:a", name="A")],
+                "core.playlists.lookup": lookup,
+            }
+        )
+        client = Client("loopback://", transport=server.transport)
+        await client.connect()
+        sync = PlaylistSync(client)
+        await sync.start()
+        assert sync.playlists["m3u:a"].last_modified == 5
+        await client.disconnect()
+
+    asyncio.run(main())
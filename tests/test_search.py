@@ -0,0 +1,43 @@
+import asyncio
+
+from mopidy_client import Client
+from mopidy_client.models import SearchResult, Track
+from mopidy_client.search import SearchMerger
+from mopidy_client.testing import FakeMopidy, FakeMopidyServer
+
+
+def test_client_usable_after_search_timeout():
+    async def main():
+        fake = FakeMopidy(
+            {
+                "core.ping": True,
+                "core.get_uri_schemes": ["local", "file"],
+                "core.library.search": lambda query, uris=None, exact=False: [
+                    SearchResult(uri=uris[0], tracks=[Track(uri=f"{uris[0]}a")])
+                ],
+            }
+        )
+        server = FakeMopidyServer(fake, latency=0.2)
+        await server.start()
+        client = Client(server.url)
+        await client.connect()
+        await client.library.search_merged({"any": ["a"]}, timeout=0.3)
+        assert await asyncio.wait_for(client.core.ping(), 1) is True
+        await client.disconnect()
+        server.stop()
+
+    asyncio.run(main())
+
+
+def test_merger_ranks_by_match_then_arrival():
+    merger = SearchMerger({"track_name": ["song"]})
+    other = Track(uri="local:other", name="Other")
+    song = Track(uri="local:song", name="Song")
+    merger.add(SearchResult(tracks=[other]))
+    merger.add(SearchResult(tracks=[other, song]))
+    assert merger.tracks == [song, other]
+    merger = SearchMerger({"track_name": ["x"]})
+    merger.add(SearchResult(tracks=[song]))
+    merger.add(SearchResult(tracks=[other]))
+    merger.add(SearchResult(tracks=[other]))
+    assert merger.tracks == [song, other]
@@ -0,0 +1,89 @@
+import asyncio
+import concurrent.futures
+import queue
+import threading
+
+import pytest
+
+from mopidy_client import ThreadedClient
+from mopidy_client.testing import FakeMopidy, FakeMopidyServer
+
+
+@pytest.fixture
+def server():
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    server = FakeMopidyServer(FakeMopidy({"core.playback.get_state": "playing"}))
+    asyncio.run_coroutine_threadsafe(server.start(), loop).result(1)
+
+    def emit(event, **data):
+        loop.call_soon_threadsafe(lambda: server.fake.emit(event, **data))
+
+    server.emit_threadsafe = emit
+    yield server
+    loop.call_soon_threadsafe(server.stop)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(1)
+    loop.close()
+
+
+def test_start_call_and_stop(server):
+    client = ThreadedClient(server.url)
+    with client:
+        assert client.running
+        assert client.playback.get_state().result(1) == "playing"
+        assert client.call("core.get_version").result(1) == "3.4.2"
+        assert client.version().result(1) == "3.4.2"
+    assert not client.running
+    with pytest.raises(RuntimeError):
+        client.call("core.get_version")
+
+
+def test_sync_handlers_run_in_executor(server):
+    received = queue.Queue()
+    with ThreadedClient(server.url) as client:
+        client.on_volume_changed(
+            lambda volume: received.put((volume, threading.current_thread()))
+        )
+        server.emit_threadsafe("volume_changed", volume=42)
+        volume, thread = received.get(timeout=1)
+        assert volume == 42
+        assert thread is not client._thread
+        assert thread is not threading.current_thread()
+
+
+def test_unsubscribe_from_another_thread(server):
+    received = queue.Queue()
+    with ThreadedClient(server.url) as client:
+        unsubscribe = client.on_volume_changed(received.put)
+        worker = threading.Thread(target=unsubscribe)
+        worker.start()
+        worker.join(1)
+        # Runs after the unsubscribe queued on the loop
+        client.submit(lambda: None).result(1)
+        assert client.client._dispatcher.listeners("volume_changed") == []
+        server.emit_threadsafe("volume_changed", volume=1)
+        with pytest.raises(queue.Empty):
+            received.get(timeout=0.1)
+
+
+def test_stream_get_timeout_keeps_later_events(server):
+    with ThreadedClient(server.url) as client:
+        with client.events("volume_changed") as stream:
+            with pytest.raises(concurrent.futures.TimeoutError):
+                stream.get(timeout=0.05)
+            server.emit_threadsafe("volume_changed", volume=1)
+            server.emit_threadsafe("volume_changed", volume=2)
+            assert stream.get(timeout=1).data == {"volume": 1}
+            assert stream.get(timeout=1).data == {"volume": 2}
+        with pytest.raises(StopIteration):
+            stream.get(timeout=1)
+
+
+def test_blocking_methods_refuse_the_loop_thread(server):
+    with ThreadedClient(server.url) as client:
+        for func in (client.events, client.stop, lambda: client.on_event("x", print)):
+            with pytest.raises(RuntimeError):
+                client.submit(func).result(1)
+        assert client.running
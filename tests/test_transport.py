@@ -0,0 +1,207 @@
+import asyncio
+import base64
+import hashlib
+import struct
+
+import pytest
+
+from mopidy_client import Client
+from mopidy_client.client import JsonRpcException
+from mopidy_client.testing import FakeMopidy, FakeMopidyServer
+from mopidy_client.transport.asyncio_ws import AsyncioTransport
+from mopidy_client.transport.base import TransportClosedError
+
+
+def _fake():
+    def fail():
+        raise ValueError("broken")
+
+    return FakeMopidy({"core.echo": lambda text: text, "core.fail": fail})
+
+
+def test_loopback_errors_match_mopidy():
+    async def main():
+        client = Client("loopback://", transport=_fake().transport)
+        await client.connect()
+
+        with pytest.raises(JsonRpcException) as info:
+            await client.call("core.playback.typo")
+        assert info.value.code == -32601
+        assert info.value.data == (
+            'Object mounted at "core.playback" has no member "typo"'
+        )
+
+        with pytest.raises(JsonRpcException) as info:
+            await client.call("core.echo", txt="a")
+        assert info.value.code == -32602
+        assert info.value.data["type"] == "TypeError"
+
+        with pytest.raises(JsonRpcException) as info:
+            await client.call("core.fail")
+        assert info.value.code == 0
+        assert info.value.data["message"] == "broken"
+        await client.disconnect()
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize("compression", [None, {}])
+@pytest.mark.parametrize("size", [0, 125, 126, 65535, 65536, 200000])
+def test_asyncio_round_trip(compression, size):
+    async def main():
+        server = FakeMopidyServer(_fake(), compression=compression)
+        await server.start()
+        client = Client(server.url, transport="asyncio")
+        await client.connect(compression=compression is not None)
+        text = "abé" * (size // 4) + "x" * (size % 4)
+        assert await client.call("core.echo", text=text) == text
+        assert client._transport.stats.compressed == (compression is not None)
+        await client.disconnect()
+        server.stop()
+
+    asyncio.run(main())
+
+
+def test_asyncio_compressed_messages_share_context():
+    async def main():
+        server = FakeMopidyServer(_fake(), compression={})
+        await server.start()
+        client = Client(server.url, transport="asyncio")
+        await client.connect(compression=True)
+        texts = [f"message {i} " * 50 for i in range(20)]
+        results = await asyncio.gather(
+            *(client.call("core.echo", text=text) for text in texts)
+        )
+        assert results == texts
+        stats = client._transport.stats
+        assert stats.wire_bytes_out < stats.bytes_out
+        await client.disconnect()
+        server.stop()
+
+    asyncio.run(main())
+
+
+def test_asyncio_server_close_ends_reading():
+    async def main():
+        server = FakeMopidyServer(_fake())
+        await server.start()
+        transport = AsyncioTransport()
+        await transport.connect(server.url)
+        server.stop()
+        assert await asyncio.wait_for(transport.read(), 1) is None
+        with pytest.raises(TransportClosedError):
+            await transport.write("{}")
+
+    asyncio.run(main())
+
+
+def test_asyncio_client_close_detaches_from_server():
+    async def main():
+        fake = _fake()
+        server = FakeMopidyServer(fake)
+        await server.start()
+        transport = AsyncioTransport()
+        await transport.connect(server.url)
+        assert len(fake.connections) == 1
+        transport.close()
+        for _ in range(100):
+            if not fake.connections:
+                break
+            await asyncio.sleep(0.01)
+        assert not fake.connections
+        server.stop()
+
+    asyncio.run(main())
+
+
+def _server_frame(opcode, payload, fin=True):
+    first = (0x80 if fin else 0) | opcode
+    if len(payload) < 126:
+        return struct.pack("!BB", first, len(payload)) + payload
+    return struct.pack("!BBH", first, 126, len(payload)) + payload
+
+
+async def _read_client_frame(reader):
+    first, second = await reader.readexactly(2)
+    length = second & 0x7F
+    if length == 126:
+        (length,) = struct.unpack("!H", await reader.readexactly(2))
+    key = await reader.readexactly(4)
+    payload = bytes(
+        byte ^ key[i % 4] for i, byte in enumerate(await reader.readexactly(length))
+    )
+    return first & 0x0F, payload
+
+
+def test_asyncio_reassembles_fragments_around_control_frames():
+    received = []
+
+    async def handle(reader, writer):
+        request = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1")
+        key = [
+            line.split(":", 1)[1].strip()
+            for line in request.split("\r\n")
+            if line.lower().startswith("sec-websocket-key:")
+        ][0]
+        accept = base64.b64encode(
+            hashlib.sha1(
+                key.encode() + b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+            ).digest()
+        )
+        writer.write(
+            b"HTTP/1.1 101 Switching Protocols\r\n"
+            b"Upgrade: websocket\r\nConnection: Upgrade\r\n"
+            b"Sec-WebSocket-Accept: " + accept + b"\r\n\r\n"
+        )
+        writer.write(_server_frame(0x1, b"hel", fin=False))
+        writer.write(_server_frame(0x9, b"ping"))
+        writer.write(_server_frame(0x0, b"lo " + b"x" * 200, fin=False))
+        writer.write(_server_frame(0x0, b"world"))
+        writer.write(_server_frame(0x8, struct.pack("!H", 1000)))
+        await writer.drain()
+        received.append(await _read_client_frame(reader))
+        received.append(await _read_client_frame(reader))
+        writer.close()
+
+    async def main():
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        transport = AsyncioTransport()
+        await transport.connect(f"ws://127.0.0.1:{port}/")
+        assert await transport.read() == "hello " + "x" * 200 + "world"
+        assert await transport.read() is None
+        for _ in range(100):
+            if len(received) == 2:
+                break
+            await asyncio.sleep(0.01)
+        server.close()
+        await server.wait_closed()
+        assert received == [(0xA, b"ping"), (0x8, struct.pack("!H", 1000))]
+
+    asyncio.run(main())
+
+
+def test_asyncio_cancelled_compressed_writes_keep_context():
+    async def main():
+        server = FakeMopidyServer(_fake(), compression={})
+        await server.start()
+        client = Client(server.url, transport="asyncio")
+        await client.connect(compression=True)
+        texts = [f"message {i} " * 50 for i in range(10)]
+
+        lock = client._transport._write_lock
+        await lock.acquire()
+        calls = [
+            asyncio.ensure_future(client.call("core.echo", text=text)) for text in texts
+        ]
+        await asyncio.sleep(0.01)
+        for call in calls[::2]:
+            call.cancel()
+        lock.release()
+
+        assert await asyncio.wait_for(asyncio.gather(*calls[1::2]), 1) == texts[1::2]
+        assert await client.call("core.echo", text=texts[0]) == texts[0]
+        await client.disconnect()
+        server.stop()
+
+    asyncio.run(main())